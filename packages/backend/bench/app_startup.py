@@ -0,0 +1,113 @@
+"""
+Boot benchmark for `App.register_routers`, on a generated `api/` tree, in fresh interpreters:
+cold (no manifest), warm (valid manifest), warm with router imports prewarmed on a thread pool,
+and warm with every group but one deferred.
+
+Usage
+-----
+```
+python bench/app_startup.py [--groups 20] [--modules 10] [--routes 5] [--prewarm 8] [-n 5]
+```
+Needs the app config at /config/config.yml, as the backend does.
+"""
+
+# === Core ===
+import os
+import re
+import sys
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+MODULE = """
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/api/{group}/{name}")
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+{routes}
+"""
+
+ROUTE = """
+@router.get("/route{index}/{{item_id}}")
+async def route{index}(item_id: int) -> Item:
+    return Item(id=item_id, name="{name}")
+"""
+
+PROBE = """
+import time
+from utils.app import App
+app = App({main!r})
+app.deferred = {deferred!r}
+app.prewarm = {prewarm!r}
+start = time.perf_counter()
+app.register_routers()
+print("BENCH", time.perf_counter() - start, flush=True)
+"""
+
+
+def generate(root: Path, groups: int, modules: int, routes: int) -> None:
+    for group in range(groups):
+        directory = root / "api" / f"group{group}"
+        directory.mkdir(parents=True)
+        for module in range(modules):
+            name = f"module{module}"
+            body = "".join(ROUTE.format(index=index, name=name) for index in range(routes))
+            (directory / f"{name}.py").write_text(MODULE.format(group=f"group{group}", name=name, routes=body))
+
+
+def measure(root: Path, number: int, deferred: list[str], keep_manifest: bool, prewarm: int = 0) -> list[float]:
+    """
+    Boots the app `number` times in fresh interpreters, returning register_routers durations in seconds
+    """
+    env = {**os.environ, "PYTHONPATH": str(SRC), "PYTHONDONTWRITEBYTECODE": "1"}
+    probe = PROBE.format(main=str(root / "main.py"), deferred=deferred, prewarm=prewarm)
+
+    out = []
+    for _ in range(number):
+        if not keep_manifest:
+            (root / ".routes.json").unlink(missing_ok=True)
+        result = subprocess.run([sys.executable, "-c", probe], env=env, cwd=root, capture_output=True, text=True, check=True)
+        out.append(float(re.search(r"BENCH (\S+)", result.stdout).group(1)))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--routes", type=int, default=5)
+    parser.add_argument("--prewarm", type=int, default=8)
+    parser.add_argument("-n", "--number", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate(root, args.groups, args.modules, args.routes)
+
+        # Builds the manifest the warm runs start from
+        measure(root, 1, [], keep_manifest=False)
+
+        runs = (
+            ("cold", [], False, 0),
+            ("warm", [], True, 0),
+            ("warm+prewarm", [], True, args.prewarm),
+            ("warm+deferred", [f"api.group{group}" for group in range(1, args.groups)], True, 0),
+        )
+        total = args.groups * args.modules
+        for name, deferred, keep, prewarm in runs:
+            times = measure(root, args.number, deferred, keep, prewarm)
+            print(f"{name:<14} median {statistics.median(times) * 1e3:>8.1f} ms  min {min(times) * 1e3:>8.1f} ms  ({total} modules, {args.number} boots)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Micro-benchmark for `Yaml.get`, comparing the cached lookup against a full
+re-read and re-parse of the config file on every call.
+
+Usage
+-----
+```
+python bench/config_get.py [config.yml] [-n 5000]
+```
+"""
+
+# === Core ===
+import sys
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from timeit import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# === Utils ===
+from utils.helper.config import Yaml
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("config", nargs="?", default=str(Path(__file__).resolve().parents[3] / "config.example.yml"))
+    parser.add_argument("-n", "--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.yml"
+        shutil.copy(args.config, path)
+
+        yml = Yaml(str(path))
+
+        def uncached():
+            yml.invalidate()
+            return yml.get("backend.uvicorn_config")
+
+        def cached():
+            return yml.get("backend.uvicorn_config")
+
+        assert uncached() == cached()
+
+        for name, func in (("uncached", uncached), ("cached", cached)):
+            total = timeit(func, number=args.number)
+            print(f"{name:<10} {total / args.number * 1e6:>10.2f} us/call  ({args.number} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Startup benchmark for the config layer, measuring import-to-first-`get` latency
+in fresh interpreters with and without compiled config snapshots.
+
+Usage
+-----
+```
+python bench/config_startup.py [config.yml] [-n 20]
+```
+"""
+
+# === Core ===
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+PROBE = """
+import time
+start = time.perf_counter()
+from utils.helper.config import Yaml
+Yaml({path!r}).get("backend.uvicorn_config")
+print(time.perf_counter() - start)
+"""
+
+
+def measure(path: Path, number: int, compiled_dir: str | None) -> list[float]:
+    """
+    Runs the probe `number` times in fresh interpreters, returning the latencies in seconds
+    """
+    env = {**os.environ, "PYTHONPATH": str(SRC), "PYTHONDONTWRITEBYTECODE": "1"}
+    env.pop("CONFIG_COMPILED_DIR", None)
+    if compiled_dir:
+        env["CONFIG_COMPILED_DIR"] = compiled_dir
+
+    out = []
+    for _ in range(number):
+        result = subprocess.run([sys.executable, "-c", PROBE.format(path=str(path))], env=env, capture_output=True, text=True, check=True)
+        out.append(float(result.stdout.strip()))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("config", nargs="?", default=str(Path(__file__).resolve().parents[3] / "config.example.yml"))
+    parser.add_argument("-n", "--number", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.yml"
+        shutil.copy(args.config, path)
+        compiled_dir = str(Path(tmp) / "compiled")
+
+        # Warm the compiled snapshot once
+        measure(path, 1, compiled_dir)
+
+        for name, directory in (("yaml", None), ("compiled", compiled_dir)):
+            samples = measure(path, args.number, directory)
+            print(f"{name:<10} median {statistics.median(samples) * 1e3:>8.2f} ms  min {min(samples) * 1e3:>8.2f} ms  ({args.number} runs)")
+
+
+if __name__ == "__main__":
+    main()
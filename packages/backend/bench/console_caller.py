@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for the caller lookup done on every Console log call, comparing the
+previous `inspect.stack()` + per-call `inspect.signature` path with frame walking.
+
+Usage
+-----
+```
+python bench/console_caller.py [-n 2000] [--depth 30]
+```
+"""
+
+# === Core ===
+import sys
+import inspect
+import argparse
+from pathlib import Path
+from timeit import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# === Utils ===
+from utils.console.Console import Console
+
+
+def legacy_caller():
+    """
+    Caller lookup as it was before frame walking, including the signature check per call
+    """
+
+    def get_file_and_line():
+        for frame in inspect.stack():
+            if "Console.py" not in frame.filename:
+                parent: str = Path(frame.filename).parent.name
+                filename = Path(frame.filename).stem
+                return f"[dim]{parent}/{filename}:{frame.lineno}[/dim]"
+        return "[dim]unknown:0[/dim]"
+
+    def lookup():
+        if len(inspect.signature(get_file_and_line).parameters) == 0:
+            return f"{get_file_and_line():<30}"
+
+    return lookup
+
+
+def nested(depth: int, func):
+    """
+    Calls func from `depth` frames deep, mimicking a call from inside a request handler
+    """
+    if depth == 0:
+        return func()
+    return nested(depth - 1, func)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=30)
+    args = parser.parse_args()
+
+    current = Console._Console__get_caller()
+    legacy = legacy_caller()
+
+    results = {}
+    for name, lookup in (("inspect", legacy), ("frames", current)):
+        total = timeit(lambda: nested(args.depth, lookup), number=args.number)
+        results[name] = total / args.number
+        print(f"{name:<10} {results[name] * 1e6:>10.2f} us/call  (depth {args.depth}, {args.number} calls)")
+
+    print(f"speedup    {results['inspect'] / results['frames']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
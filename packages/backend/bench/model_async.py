@@ -0,0 +1,103 @@
+"""
+Load test comparing concurrent request throughput of routes reading through the sync
+`WrapperModel` and the async `AsyncWrapperModel`.
+
+Three routes fetch the same document:
+- `async def` + `WrapperModel`: blocks the event loop, requests are served one at a time
+- `def` + `WrapperModel`: runs in the threadpool, bounded by its 40 threads
+- `async def` + `AsyncWrapperModel`: awaits the driver, the loop keeps serving requests
+
+Usage
+-----
+```
+python bench/model_async.py --uri mongodb://localhost:27017 [--requests 5000] [--concurrency 200]
+```
+A real server is required, mongomock has no async client.
+"""
+
+# === Core ===
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# === Utils ===
+import httpx
+import pymongo
+from fastapi import FastAPI
+from utils.abc.handlers.base import WrapperModel
+from utils.abc.handlers.async_base import AsyncWrapperModel
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    """
+    Sends `requests` GETs to `path` with at most `concurrency` in flight
+
+    :returns float: Requests per second
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one() -> None:
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", required=True)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    collection = pymongo.MongoClient(args.uri)["bench"]["file_metas"]
+
+    class BenchFileMeta(WrapperModel):
+        __collection__ = collection
+
+        id: str
+        filename: str
+
+    class AsyncBenchFileMeta(AsyncWrapperModel, BenchFileMeta):
+        __async_collection__ = pymongo.AsyncMongoClient(args.uri)["bench"]["file_metas"]
+
+    collection.drop()
+    collection.insert_one({"id": "file-0", "filename": "image-0.png"})
+
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        return BenchFileMeta.get(id="file-0").filename
+
+    @app.get("/threadpool")
+    def threadpool():
+        return BenchFileMeta.get(id="file-0").filename
+
+    @app.get("/async")
+    async def asynchronous():
+        return (await AsyncBenchFileMeta.get(id="file-0")).filename
+
+    async def run() -> None:
+        # A single loop for every run, the async client stays bound to the loop it first ran on
+        for path in ("/blocking", "/threadpool", "/async"):
+            throughput = await load(app, path, args.requests, args.concurrency)
+            print(f"{path:<12} {throughput:>10.0f} req/s  ({args.requests} requests, concurrency {args.concurrency})")
+
+    asyncio.run(run())
+
+    collection.drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Throughput benchmark for `WrapperModel` writes, comparing one `insert_one` per model with
+chunked `insert_many`, from models and from plain documents.
+
+Usage
+-----
+```
+python bench/model_bulk.py --uri mongodb://localhost:27017 [--documents 20000]
+python bench/model_bulk.py  # mongomock stand-in, only shows the client-side overhead
+```
+"""
+
+# === Core ===
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# === Utils ===
+from utils.abc.handlers.base import WrapperModel
+
+
+def collection(uri: str | None):
+    """
+    Benchmark collection on a real server when a uri is given, in mongomock otherwise
+    """
+    if uri:
+        import pymongo
+        return pymongo.MongoClient(uri)["bench"]["file_metas"]
+
+    import mongomock
+    return mongomock.MongoClient()["bench"]["file_metas"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", default=None)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    class BenchFileMeta(WrapperModel):
+        __collection__ = collection(args.uri)
+
+        id: str
+        filename: str
+        size: int
+        tags: list[str]
+
+    def documents():
+        return [{"id": f"file-{i}", "filename": f"image-{i}.png", "size": i, "tags": ["bench"]} for i in range(args.documents)]
+
+    def models():
+        return [BenchFileMeta(**document) for document in documents()]
+
+    def insert_one(items):
+        for item in items:
+            item.insert_low()
+
+    def insert_many(items):
+        BenchFileMeta.insert_many(items, chunk_size=args.chunk_size)
+
+    runs = (
+        ("insert_one", insert_one, models),
+        ("insert_many", insert_many, models),
+        ("insert_many (dicts)", insert_many, documents),
+    )
+
+    for name, run, factory in runs:
+        BenchFileMeta.__collection__.drop()
+        items = factory()
+
+        start = time.perf_counter()
+        run(items)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:<20} {args.documents / elapsed:>12.0f} docs/s  ({elapsed:.2f} s)")
+
+    BenchFileMeta.__collection__.drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Per-document decode cost of the ways `WrapperModel` turns database documents into results,
+on documents shaped like `file_metas` ones.
+
+- bson: `bson.decode` of the wire bytes, paid by every mode, and all the raw mode pays
+- validate: `cls(**document)`, the full pydantic validation reads used to go through
+- construct: `cls.model_construct(**document)`
+- trusted: `cls.from_document(document)`, the path database reads now take
+
+Usage
+-----
+```
+python bench/model_decode.py [-n 20000] [--extras 10]
+```
+"""
+
+# === Core ===
+import sys
+import bson
+import random
+import argparse
+from pathlib import Path
+from timeit import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# === Utils ===
+from bson import ObjectId
+from utils.abc.handlers.base import WrapperModel
+
+
+class BenchFileMeta(WrapperModel):
+    id: str
+    filename: str
+    size: int
+    mime: str
+    owner: str
+    tags: list[str] = []
+    created: datetime
+    hash: str
+
+
+def document(extras: int) -> dict:
+    """
+    A file_metas like document, with `extras` fields the model doesn't declare
+    """
+    document = {
+        "_id": ObjectId(),
+        "id": f"{random.getrandbits(64):016x}",
+        "filename": "IMG_20240101_120000.jpg",
+        "size": random.randint(1, 10**7),
+        "mime": "image/jpeg",
+        "owner": "user-42",
+        "tags": ["holiday", "beach", "2024"],
+        "created": datetime.now(timezone.utc),
+        "hash": f"{random.getrandbits(256):064x}",
+    }
+    for i in range(extras):
+        document[f"exif_{i}"] = random.choice((i, f"value-{i}", float(i)))
+    return document
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    parser.add_argument("--extras", type=int, default=10)
+    args = parser.parse_args()
+
+    source = document(args.extras)
+    encoded = bson.encode(source)
+    decoded = bson.decode(encoded)
+
+    assert BenchFileMeta.trusts_documents()
+    assert BenchFileMeta.from_document(decoded) == BenchFileMeta(**decoded)
+
+    modes = (
+        ("bson", lambda: bson.decode(encoded)),
+        ("validate", lambda: BenchFileMeta(**decoded)),
+        ("construct", lambda: BenchFileMeta.model_construct(**decoded)),
+        ("trusted", lambda: BenchFileMeta.from_document(decoded)),
+    )
+
+    results = {}
+    for name, func in modes:
+        results[name] = timeit(func, number=args.number) / args.number
+        print(f"{name:<10} {results[name] * 1e6:>8.2f} us/doc  ({args.number} docs, {len(decoded)} fields)")
+
+    print(f"trusted is {results['validate'] / results['trusted']:.1f}x cheaper than validate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark for `WrapperModel.random` on a seeded collection, comparing the previous
+load-everything approach with the server-side `$sample` stage, in time and peak memory.
+
+Usage
+-----
+```
+python bench/model_random.py --uri mongodb://localhost:27017 [--documents 200000]
+python bench/model_random.py  # mongomock stand-in, which implements $sample in memory, so only
+                              # a real server shows the constant memory of the server-side path
+```
+"""
+
+# === Core ===
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# === Utils ===
+from utils.abc.handlers.base import WrapperModel
+
+
+def collection(uri: str | None):
+    """
+    Benchmark collection on a real server when a uri is given, in mongomock otherwise
+    """
+    if uri:
+        import pymongo
+        return pymongo.MongoClient(uri)["bench"]["file_metas"]
+
+    import mongomock
+    return mongomock.MongoClient()["bench"]["file_metas"]
+
+
+def seed(target, documents: int) -> None:
+    target.drop()
+    batch = []
+    for i in range(documents):
+        batch.append({"id": f"file-{i}", "filename": f"image-{i}.png", "size": random.randint(1, 10**7), "tags": ["bench", f"t{i % 50}"]})
+        if len(batch) == 10000:
+            target.insert_many(batch)
+            batch = []
+    if batch:
+        target.insert_many(batch)
+
+
+def measure(name: str, func, number: int) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} {elapsed / number * 1e3:>10.2f} ms/call  peak {peak / 1024**2:>8.2f} MiB  ({number} calls)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", default=None)
+    parser.add_argument("--documents", type=int, default=50000)
+    parser.add_argument("-n", "--number", type=int, default=10)
+    args = parser.parse_args()
+
+    class BenchFileMeta(WrapperModel):
+        __collection__ = collection(args.uri)
+
+    seed(BenchFileMeta.__collection__, args.documents)
+
+    def legacy(size: int):
+        docs = [doc for doc in BenchFileMeta.__collection__.find({})]
+        return random.sample(docs, min(size, len(docs)))
+
+    for size in (1, 100):
+        print(f"-- {args.documents} documents, drawing {size}")
+        measure("find-all", lambda: legacy(size), args.number)
+        measure("$sample", lambda: BenchFileMeta.random(n=size), args.number)
+
+    BenchFileMeta.__collection__.drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Load test of the production server mode (`utils.server.serve`), one worker against N.
+
+Each run starts the server in a fresh process on a local port, with an app factory exposing
+a light route (`/items/{id}`) and a CPU bound one (`/work`), then hammers it from several
+client processes, so the load generator isn't the bottleneck, and reports throughput and
+latency percentiles.
+
+Usage
+-----
+```
+python bench/server_workers.py [--workers 1 4] [--path /work] [--duration 10] [--clients 4] [--concurrency 64] [--reuse-port]
+```
+"""
+
+# === Core ===
+import os
+import sys
+import time
+import socket
+import asyncio
+import hashlib
+import argparse
+import statistics
+import subprocess
+import multiprocessing
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().parent
+SRC = BENCH.parent / "src"
+
+
+def create_app():
+    """
+    App factory the workers build, routes only, no database
+    """
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def items(item_id: int):
+        return {"item_id": item_id, "ok": "hi again"}
+
+    @app.get("/work")
+    async def work(rounds: int = 2000):
+        digest = b""
+        for _ in range(rounds):
+            digest = hashlib.sha256(digest).digest()
+        return {"digest": digest.hex()}
+
+    return app
+
+
+SERVER = """
+import sys
+sys.path[:0] = [{bench!r}, {src!r}]
+from utils.server import serve
+serve("server_workers:create_app", {options!r})
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server didn't listen on {port} within {timeout}s")
+
+
+def client(url: str, duration: float, concurrency: int) -> list[float]:
+    """
+    One client process, `concurrency` keep-alive connections sending GETs for `duration` seconds
+
+    :returns list[float]: Latency of every successful request, in seconds
+    """
+    import httpx
+
+    async def run() -> list[float]:
+        latencies: list[float] = []
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30) as http:
+            end = time.monotonic() + duration
+
+            async def worker():
+                while time.monotonic() < end:
+                    start = time.perf_counter()
+                    response = await http.get(url)
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def measure(workers: int, args: argparse.Namespace) -> None:
+    port = free_port()
+    options = {
+        "host": "127.0.0.1",
+        "port": port,
+        "workers": workers,
+        "log_level": "warning",
+        "access_log": False,
+        "reuse_port": args.reuse_port,
+        "backlog": 2048,
+    }
+    server = subprocess.Popen([sys.executable, "-c", SERVER.format(bench=str(BENCH), src=str(SRC), options=options)], stdout=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        # Lets every worker finish its startup, the port answers as soon as the first one listens
+        time.sleep(1 + workers * 0.5)
+
+        url = f"http://127.0.0.1:{port}{args.path}"
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            results = pool.starmap(client, [(url, args.duration, args.concurrency)] * args.clients)
+    finally:
+        server.terminate()
+        server.wait(30)
+
+    latencies = sorted(latency for result in results for latency in result)
+    if not latencies:
+        print(f"{workers:>3} worker(s): no successful request")
+        return
+
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{workers:>3} worker(s): {len(latencies) / args.duration:>9.0f} req/s  "
+        f"p50 {statistics.median(latencies) * 1e3:>7.1f} ms  p99 {p99 * 1e3:>7.1f} ms  ({len(latencies)} requests)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--path", default="/work")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--reuse-port", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{args.path}, {args.clients} clients x {args.concurrency} connections, {args.duration:.0f}s per run")
+    for workers in args.workers:
+        measure(workers, args)
+
+
+if __name__ == "__main__":
+    main()
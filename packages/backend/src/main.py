@@ -1,24 +1,35 @@
 # === Core ===
 import sys
-import uvicorn
 sys.dont_write_bytecode = True
 
 # === Utils ===
-from utils.console import console
-from utils.mongo.Client import MongoClient
+from utils.server import serve, server_config
 
-from utils.app import App
-app = App(__file__)
 
-@app.get("/")
-def read_root():
-    return {"hello": "world"}
+def create_app():
+    """
+    App factory, run by every worker process after it's spawned
 
-@app.get("/items/{item_id}")
-def read_items(item_id: int):
-    return {"item_id": item_id, "ok": "hi again"}
+    The app stack is imported here rather than at the top of the file, this module is also
+    imported by the supervisor and twice by every worker (as `__mp_main__` and as `main`).
+    """
+    from utils.app import App
+    from utils.console import console
 
-app.register_routers()
+    app = App(__file__)
 
-console.info("Starting app...")
-uvicorn.run(app, **app.config)
+    @app.get("/")
+    def read_root():
+        return {"hello": "world"}
+
+    @app.get("/items/{item_id}")
+    def read_items(item_id: int):
+        return {"item_id": item_id, "ok": "hi again"}
+
+    app.register_routers()
+    console.info("Starting app...")
+    return app
+
+
+if __name__ == "__main__":
+    serve("main:create_app", server_config())
@@ -1,3 +1,7 @@
+from utils.abc.handlers.base import WrapperModel
+from utils.abc.handlers.cache import ModelCache
+from utils.abc.handlers.indexes import Index
 from utils.abc.handlers.file_meta import FileMeta
+from utils.abc.handlers.session import AsyncSession, Session
 
-__all__ = ["FileMeta"]
\ No newline at end of file
+__all__ = ["WrapperModel", "Index", "ModelCache", "FileMeta", "Session", "AsyncSession"]
\ No newline at end of file
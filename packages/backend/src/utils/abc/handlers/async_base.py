@@ -0,0 +1,401 @@
+# === Core ===
+import random
+from bson import ObjectId
+
+# === Utils ===
+from utils.mongo.Client import MongoClient
+from utils.abc.handlers.base import BulkResult, WrapperModel
+
+# === Typing ===
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.asynchronous.collection import AsyncCollection
+from typing import Any, AsyncIterator, ClassVar, Iterable, Optional, Self
+from pymongo.results import DeleteResult, InsertOneResult, UpdateResult
+
+
+class AsyncWrapperModel(WrapperModel):
+    """
+    Async counterpart of :class:`WrapperModel`, backed by pymongo's `AsyncMongoClient` so routes
+    awaiting the database never block the event loop.
+
+    Model definitions and collection bindings are shared with the sync models: the async
+    collection is derived from `__collection__` (same database and name) unless
+    `__async_collection__` is set explicitly.
+
+    Usage
+    -----
+    ```python
+    class AsyncFileMeta(AsyncWrapperModel, FileMeta):
+        pass
+
+    meta = await AsyncFileMeta.get(id="...")
+    await meta.set({"tags": ["a"]})
+    async for meta in AsyncFileMeta.find(tags="a"):
+        ...
+    ```
+    """
+
+    __async_collection__: ClassVar[Optional[AsyncCollection]] = None
+
+    @classmethod
+    def async_collection(cls) -> AsyncCollection:
+        """
+        Async collection bound to this model
+        """
+        if cls.__async_collection__ is not None:
+            return cls.__async_collection__
+        return MongoClient.async_collection(cls.__collection__)
+
+    # === Creation ===
+
+    async def insert(self) -> Self:
+        """
+        Inserts the current model instance into the database and returns the instance
+        """
+        await self.insert_low()
+        return self
+
+    async def insert_low(self) -> InsertOneResult:
+        """
+        Inserts the current object into the database
+        """
+        result = await self.async_collection().insert_one(self.safe_dump())
+        self.uncache(result.inserted_id)
+        return result
+
+    @classmethod
+    async def bulk_write(cls, ops: Iterable[Any], chunk_size: int = 1000, ordered: bool = False) -> BulkResult:
+        """
+        Async :meth:`WrapperModel.bulk_write`, one awaited `bulk_write` per chunk
+        """
+        result = BulkResult()
+        chunk: list[Any] = []
+        offset = 0
+
+        async def flush() -> None:
+            try:
+                details = (await cls.async_collection().bulk_write(chunk, ordered=ordered)).bulk_api_result
+            except BulkWriteError as error:
+                details = error.details
+
+            result.inserted += details.get("nInserted", 0)
+            result.matched += details.get("nMatched", 0)
+            result.modified += details.get("nModified", 0)
+            result.deleted += details.get("nRemoved", 0)
+            result.upserted += details.get("nUpserted", 0)
+
+            for upsert in details.get("upserted", []):
+                result.ids[offset + upsert["index"]] = upsert["_id"]
+            for write_error in details.get("writeErrors", []):
+                result.errors[offset + write_error["index"]] = write_error
+
+        # Whatever was written before an error or a stop went through, cached models may be stale
+        try:
+            for op in ops:
+                chunk.append(op)
+                if len(chunk) < chunk_size:
+                    continue
+
+                await flush()
+                if ordered and result.errors:
+                    return result
+                offset += len(chunk)
+                chunk = []
+
+            if chunk:
+                await flush()
+        finally:
+            cls.uncache()
+
+        return result
+
+    @classmethod
+    async def insert_many(cls, models: Iterable["Self | dict[str, Any]"], chunk_size: int = 1000) -> BulkResult:
+        """
+        Async :meth:`WrapperModel.insert_many`
+        """
+        documents = [cls.document(model) for model in models]
+        result = await cls.bulk_write((InsertOne(document) for document in documents), chunk_size)
+        result.ids = {index: document.get("_id") for index, document in enumerate(documents) if index not in result.errors}
+        return result
+
+    @classmethod
+    async def upsert_many(cls, models: Iterable["Self | dict[str, Any]"], key: str | tuple[str, ...] = "id", chunk_size: int = 1000) -> BulkResult:
+        """
+        Async :meth:`WrapperModel.upsert_many`
+        """
+        keys = (key,) if isinstance(key, str) else key
+        missing: dict[int, dict[str, Any]] = {}
+        positions: list[int] = []
+
+        ops = []
+        for index, model in enumerate(models):
+            document = cls.document(model)
+            if any(field not in document for field in keys):
+                missing[index] = {"index": index, "errmsg": f"Document is missing key fields {keys}"}
+                continue
+
+            positions.append(index)
+            ops.append(UpdateOne({field: document[field] for field in keys}, {"$set": document}, upsert=True))
+
+        result = await cls.bulk_write(ops, chunk_size)
+        result.ids = {positions[index]: value for index, value in result.ids.items()}
+        result.errors = {positions[index]: value for index, value in result.errors.items()}
+        result.errors.update(missing)
+        return result
+
+    # === Retrieval & Existence ===
+
+    @classmethod
+    async def get(cls, **filters) -> Self:
+        """
+        Retrieves a document from the collection based on the provided filters
+
+        :raises LookupError: If no matching document is found
+        """
+        cache = cls.__cache__
+        if cache is None:
+            search = await cls.async_collection().find_one(filters)
+            if not search:
+                raise LookupError(f"Failed to find document, filters: {filters}")
+            return cls.from_document(search)
+
+        cache.start_watcher(cls.__collection__)
+
+        key = cache.key(cls, filters)
+        instance = cache.get(key)
+        if instance is None:
+            search = await cls.async_collection().find_one(filters)
+            if not search:
+                raise LookupError(f"Failed to find document, filters: {filters}")
+            instance = cls.from_document(search)
+            cache.put(key, search.get("_id"), instance)
+
+        return instance.model_copy(deep=True)
+
+    @classmethod
+    async def get_raw(cls, projection: Optional[list[str]] = None, **filters) -> dict[str, Any]:
+        """
+        Async :meth:`WrapperModel.get_raw`
+        """
+        search = await cls.async_collection().find_one(filters, projection=projection)
+        if not search:
+            raise LookupError(f"Failed to find document, filters: {filters}")
+        return search
+
+    @classmethod
+    async def exists(cls, **filters) -> bool:
+        """
+        Async :meth:`WrapperModel.exists`, covered by an index on the filtered fields
+        """
+        return await cls.async_collection().find_one(filters, projection=cls.covering(filters)) is not None
+
+    @classmethod
+    async def count(cls, limit: int = 0, **filters) -> int:
+        """
+        Async :meth:`WrapperModel.count`
+        """
+        if limit:
+            return await cls.async_collection().count_documents(filters, limit=limit)
+        return await cls.async_collection().count_documents(filters)
+
+    @classmethod
+    async def exists_many(cls, values: Iterable[Any], field: str = "id", chunk_size: int = 1000, **filters) -> set[Any]:
+        """
+        Async :meth:`WrapperModel.exists_many`
+        """
+        wanted = list(dict.fromkeys(values))
+        found: set[Any] = set()
+        projection = {field: 1} if field == "_id" else {field: 1, "_id": 0}
+
+        for start in range(0, len(wanted), chunk_size):
+            chunk = wanted[start:start + chunk_size]
+            lookup = set(chunk)
+            async for document in cls.async_collection().find({**filters, field: {"$in": chunk}}, projection=projection):
+                found.update(value for value in cls.values_at(document, field) if value in lookup)
+
+        return found
+
+    @classmethod
+    async def random(cls, n: Optional[int] = None, **filters) -> Optional[Self] | list[Self]:
+        """
+        Async :meth:`WrapperModel.random`
+        """
+        size = 1 if n is None else n
+        if size <= 0:
+            return None if n is None else []
+
+        pipeline: list[dict[str, Any]] = [{"$match": filters}] if filters else []
+        pipeline.append({"$sample": {"size": size}})
+
+        collection = cls.async_collection()
+        try:
+            docs = await (await collection.aggregate(pipeline)).to_list()
+        except (OperationFailure, NotImplementedError):
+            count = await collection.count_documents(filters)
+            docs = []
+            for offset in random.sample(range(count), min(size, count)):
+                docs.extend(await collection.find(filters).skip(offset).limit(1).to_list())
+
+        instances = [cls.from_document(doc) for doc in cls.sampled(docs)]
+        if n is None:
+            return instances[0] if instances else None
+        return instances
+
+    @classmethod
+    async def find(
+        cls,
+        projection: Optional[list[str]] = None,
+        batch_size: int = 500,
+        sort: Optional[list[tuple[str, int]]] = None,
+        limit: int = 0,
+        raw: bool = False,
+        **filters,
+    ) -> AsyncIterator[Self]:
+        """
+        Async :meth:`WrapperModel.find`, use with `async for`
+        """
+        cursor = cls.async_collection().find(filters, projection=projection, batch_size=batch_size, limit=limit)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        async with cursor:
+            async for document in cursor:
+                if raw:
+                    yield document
+                elif projection is None:
+                    yield cls.from_document(document)
+                else:
+                    yield cls.from_projection(document)
+
+    @classmethod
+    async def page(
+        cls,
+        after: Any = None,
+        limit: int = 50,
+        key: str = "_id",
+        projection: Optional[list[str]] = None,
+        raw: bool = False,
+        **filters,
+    ) -> tuple[list[Self], Any]:
+        """
+        Async :meth:`WrapperModel.page`
+        """
+        if limit <= 0:
+            raise ValueError(f"Page size must be positive, got {limit}")
+
+        if key == "_id" and isinstance(after, str) and ObjectId.is_valid(after):
+            after = ObjectId(after)
+
+        if after is not None:
+            filters[key] = {"$gt": after}
+
+        if projection is not None and key not in projection:
+            projection = [*projection, key]
+
+        documents = await cls.async_collection().find(filters, projection=projection, limit=limit).sort(key, 1).to_list()
+        if raw:
+            items = documents
+        elif projection is None:
+            items = [cls.from_document(document) for document in documents]
+        else:
+            items = [cls.from_projection(document) for document in documents]
+
+        if len(documents) < limit or not documents:
+            return items, None
+
+        last = documents[-1][key]
+        return items, str(last) if isinstance(last, ObjectId) else last
+
+    # === Modification ===
+
+    async def update(self, filter: dict[str, Any] = None, operation: str = "", update: dict[str, Any] = {}) -> UpdateResult:
+        """
+        Updates a document in the given collection using the specified operation and filter
+        """
+        custom = filter is not None
+        if filter is None:
+            filter = self.identity()
+
+        result = await self.async_collection().update_one(filter, {operation: update})
+        self.uncache(None if custom else self.cached_id())
+        return result
+
+    async def set(self, update: dict[str, Any], local: bool = False, **filters) -> None:
+        """
+        Async :meth:`WrapperModel.set`, `local` applies the update in memory instead of reading the document back
+
+        :raises LookupError: If no matching document is found
+        """
+        custom = bool(filters)
+        if not filters:
+            filters = self.identity()
+
+        if local:
+            result = await self.async_collection().update_one(filters, {"$set": update})
+            self.uncache(None if custom else self.cached_id())
+            if not result.matched_count:
+                raise LookupError(f"Failed to find document, filters: {filters}")
+
+            self.apply_set(update)
+            return
+
+        document = await self.async_collection().find_one_and_update(filters, {"$set": update}, return_document=ReturnDocument.AFTER)
+        if not document:
+            raise LookupError(f"Failed to find document, filters: {filters}")
+
+        self.uncache(document.get("_id"))
+        self.load(document)
+
+    async def save(self, **filters) -> Optional[UpdateResult]:
+        """
+        Sends the fields assigned since the model was loaded or last saved as a single `$set`
+        """
+        self.require_complete("save")
+        if not self._dirty:
+            return None
+
+        custom = bool(filters)
+        if not filters:
+            filters = self.identity()
+
+        changes = self.model_dump(include=set(self._dirty))
+        changes.pop("_id", None)
+
+        result = await self.async_collection().update_one(filters, {"$set": changes})
+        self.uncache(None if custom else self.cached_id())
+        self._dirty.clear()
+        return result
+
+    async def refresh(self, **filters) -> None:
+        """
+        Refreshes the current model instance with the latest data from the database
+
+        :raises LookupError: If no matching document is found
+        """
+        if not filters:
+            filters = self.identity()
+
+        search = await self.async_collection().find_one(filters)
+        if not search:
+            raise LookupError(f"Failed to find document, filters: {filters}")
+        self.load(search)
+
+    # === Deletion ===
+
+    async def delete(self) -> DeleteResult:
+        """
+        Deletes the current document from the database
+
+        :raises LookupError: If both `_id` and `id` are missing or `None`
+        """
+        if self._id:
+            result = await self.async_collection().delete_one({"_id": self._id})
+        elif hasattr(self, "id") and self.id:
+            result = await self.async_collection().delete_one({"id": self.id})
+        else:
+            raise LookupError("Current document has no identifier (missing both `_id` and `id`)")
+
+        self.uncache(self.cached_id())
+        return result
@@ -1,13 +1,54 @@
 # === Core ===
 import random
+from enum import Enum
+from itertools import islice
+from dataclasses import dataclass, field, is_dataclass
+from bson import ObjectId
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+
+# === Utils ===
+from utils.abc.handlers.cache import ModelCache
+from utils.abc.handlers.indexes import Index, sync_indexes
 
 # === Typing ===
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from pymongo.collection import Collection
-from typing import Any, ClassVar, Optional, Self
+from pymongo.errors import BulkWriteError, OperationFailure
+from typing import Any, ClassVar, Iterable, Iterator, Literal, Optional, Self, get_args, get_origin, overload
 from pymongo.results import UpdateResult, InsertOneResult
 
 
+@dataclass
+class BulkResult:
+    """
+    Outcome of a chunked bulk write, operations are referred to by their position in the input
+
+    :param int inserted: Amount of inserted documents
+    :param int matched: Amount of documents matched by updates
+    :param int modified: Amount of documents modified by updates
+    :param int deleted: Amount of deleted documents
+    :param int upserted: Amount of documents inserted by upserts
+    :param dict[int, Any] ids: `_id` of every inserted or upserted document
+    :param dict[int, dict[str, Any]] errors: Write error of every failed operation
+    """
+
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    deleted: int = 0
+    upserted: int = 0
+    ids: dict[int, Any] = field(default_factory=dict)
+    errors: dict[int, dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+# Per model: whether documents are trusted, and the private attributes to initialize if they are
+_load_plans: dict[type, Optional[tuple[tuple[str, Any], ...]]] = {}
+
+
 class WrapperModel(BaseModel):
     """
     Wrapper for :class:`pydantic.BaseModel` that has some default functionality for all children
@@ -16,9 +57,247 @@ class WrapperModel(BaseModel):
 
     __collection__: ClassVar[Collection]
 
+    # Indexes the collection should have, created by ensure_indexes()
+    __indexes__: ClassVar[list[Index]] = []
+
+    # Opt-in read-through cache of get(), see ModelCache
+    __cache__: ClassVar[Optional[ModelCache]] = None
+
+    # Whether database documents skip validation in from_document(), None decides from the fields
+    __trusted__: ClassVar[Optional[bool]] = None
+
+    # Fields assigned since the model was loaded or saved, see save()
+    _dirty: set[str] = PrivateAttr(default_factory=set)
+
+    # Fields fetched by a projection, None when the whole document was loaded, see from_projection()
+    _loaded: Optional[frozenset[str]] = PrivateAttr(default=None)
+
     class Config:
         extra = "allow"
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._dirty.add(name)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+
+        # Caches are labelled after the model declaring them
+        cache = cls.__dict__.get("__cache__")
+        if cache is not None:
+            cache.name = cls.__name__
+
+    # === Loading ===
+
+    @classmethod
+    def trusts_documents(cls) -> bool:
+        """
+        Whether documents read from the database can be loaded without validation
+
+        Our own documents already hold the right types, except for what BSON can't represent:
+        nested models, enums, tuples, sets and dataclasses come back as dicts, strings and lists.
+        Models with such fields, aliases or validators are validated, unless `__trusted__` says
+        otherwise.
+        """
+        if cls in _load_plans:
+            return _load_plans[cls] is not None
+
+        trusted = cls.__trusted__
+        if trusted is None:
+            decorators = cls.__pydantic_decorators__
+            trusted = not (
+                decorators.field_validators
+                or decorators.model_validators
+                or decorators.validators
+                or decorators.root_validators
+                or any(info.alias or info.validation_alias for info in cls.model_fields.values())
+                or any(cls.__converted(info.annotation) for info in cls.model_fields.values())
+            )
+
+        _load_plans[cls] = tuple(cls.__private_attributes__.items()) if trusted else None
+        return trusted
+
+    @staticmethod
+    def __converted(annotation: Any) -> bool:
+        """
+        Whether validation changes the type of a value of this annotation read from BSON
+        """
+        if isinstance(annotation, type):
+            if issubclass(annotation, (BaseModel, Enum, tuple, set, frozenset)) or is_dataclass(annotation):
+                return True
+        if get_origin(annotation) is Literal:
+            return False
+        return any(WrapperModel.__converted(argument) for argument in get_args(annotation))
+
+    @classmethod
+    def from_document(cls, document: dict[str, Any]) -> Self:
+        """
+        Builds an instance from a document read from the database
+
+        Trusted models (see :meth:`trusts_documents`) skip validation: known fields and extras
+        are assigned as they are and missing fields get their defaults, which skips the work
+        `cls(**document)` does, see `bench/model_decode.py`. Others are validated as usual.
+
+        :param dict[str, Any] document: Full document, as returned by pymongo
+        :returns Self: The model instance
+        """
+        plan = _load_plans.get(cls)
+        if plan is None:
+            if not cls.trusts_documents():
+                return cls(**document)
+            plan = _load_plans[cls]
+
+        fields = cls.__pydantic_fields__
+        values: dict[str, Any] = {}
+        extra: dict[str, Any] = {}
+        for key, value in document.items():
+            if key in fields:
+                values[key] = value
+            else:
+                extra[key] = value
+
+        fields_set = set(values)
+        if len(values) != len(fields):
+            for name, info in fields.items():
+                if name not in values and not info.is_required():
+                    values[name] = info.get_default(call_default_factory=True, validated_data=values)
+
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_extra__", extra)
+        object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(instance, "__pydantic_private__", {name: private.get_default() for name, private in plan})
+        return instance
+
+    @classmethod
+    def from_projection(cls, document: dict[str, Any]) -> Self:
+        """
+        Builds a partial instance from a document read with a projection
+
+        Only the fetched fields are set, as they are stored (no validation): reading any other
+        field raises `AttributeError` instead of returning its default, and `model_dump` only
+        holds the fetched ones. Partial instances refuse to be written whole (`insert`,
+        `insert_many`, `upsert_many`, `save`) since that would overwrite the fields that weren't
+        fetched, `refresh()` loads the rest of the document and makes them writable again.
+
+        :param dict[str, Any] document: Projected document, as returned by pymongo
+        :returns Self: The partial instance
+        """
+        fields = cls.__pydantic_fields__
+        values: dict[str, Any] = {}
+        extra: dict[str, Any] = {}
+        for key, value in document.items():
+            if key in fields:
+                values[key] = value
+            else:
+                extra[key] = value
+
+        private = {name: attribute.get_default() for name, attribute in cls.__private_attributes__.items()}
+        private["_loaded"] = frozenset(document)
+
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_extra__", extra)
+        object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+        object.__setattr__(instance, "__pydantic_private__", private)
+        return instance
+
+    @property
+    def partial(self) -> bool:
+        """
+        Whether the instance only holds the fields of a projection, see :meth:`from_projection`
+        """
+        return self._loaded is not None
+
+    def require_complete(self, action: str) -> None:
+        """
+        :raises ValueError: If the instance is partial, writing it would overwrite the fields that weren't fetched
+        """
+        if self._loaded is not None:
+            raise ValueError(
+                f"Can't {action} a partial {type(self).__name__}, it only holds the projected fields "
+                f"{sorted(self._loaded)}, refresh() it first"
+            )
+
+    @classmethod
+    def get_raw(cls, projection: Optional[list[str]] = None, **filters) -> dict[str, Any]:
+        """
+        Same as :meth:`get` but returns the document as pymongo decoded it, no model is built
+
+        Meant for read-only endpoints returning documents as they are.
+
+        :param Optional[list[str]] projection: Fields to fetch, everything if not given
+        :param kwargs filters: MongoDB filter to locate the document
+        :raises LookupError: If no matching document is found
+        """
+        search = cls.__collection__.find_one(filters, projection=projection)
+        if not search:
+            raise LookupError(f"Failed to find document, filters: {filters}")
+        return search
+
+    # === Cache ===
+
+    @classmethod
+    def uncache(cls, _id: Any = None) -> None:
+        """
+        Drops the cached instances of a document, of every document if `_id` isn't known
+        """
+        if cls.__cache__ is not None:
+            cls.__cache__.invalidate(_id)
+
+    def cached_id(self) -> Any:
+        """
+        `_id` of the current document, None if it was never stored or loaded
+        """
+        return (self.__pydantic_extra__ or {}).get("_id")
+
+    # === Indexes ===
+
+    @classmethod
+    def models(cls) -> list[type["WrapperModel"]]:
+        """
+        Every subclass bound to a collection, at any depth
+        """
+        found: list[type[WrapperModel]] = []
+        pending = list(cls.__subclasses__())
+        while pending:
+            model = pending.pop()
+            pending.extend(model.__subclasses__())
+            if getattr(model, "__collection__", None) is not None and model not in found:
+                found.append(model)
+        return found
+
+    @classmethod
+    def ensure_indexes(cls) -> list[str]:
+        """
+        Creates the indexes declared in `__indexes__` that the collection is missing
+
+        :returns list[str]: Names of the created indexes
+        """
+        if not cls.__indexes__:
+            return []
+        return sync_indexes(cls.__collection__, cls.__indexes__)
+
+    @classmethod
+    def ensure_all_indexes(cls) -> dict[str, list[str]]:
+        """
+        Runs :meth:`ensure_indexes` for every model, once per collection
+
+        Models sharing a collection (an async model built on a sync one) have their
+        declarations merged.
+
+        :returns dict[str, list[str]]: Created index names by collection
+        """
+        declared: dict[str, tuple[Collection, list[Index]]] = {}
+        for model in cls.models():
+            collection = model.__collection__
+            _, indexes = declared.setdefault(collection.full_name, (collection, []))
+            indexes.extend(index for index in model.__indexes__ if index not in indexes)
+
+        return {name: sync_indexes(collection, indexes) for name, (collection, indexes) in declared.items() if indexes}
+
     # === Creation & Serialization ===
     def safe_dump(self, *args, **kwargs) -> dict[str, Any]:
         """
@@ -34,9 +313,12 @@ class WrapperModel(BaseModel):
 
         :param Any args: Positional arguments passed to `model_dump`
         :param Any kwargs: Keyword arguments passed to `model_dump`
+        :raises ValueError: If the instance is partial, see :meth:`from_projection`
         :returns dict[str, Any]: Serialized dictionary representation of the model
         """
 
+        self.require_complete("write")
+
         # Default Behavior
         document = self.model_dump(*args, **kwargs)
 
@@ -93,7 +375,131 @@ class WrapperModel(BaseModel):
         :returns pymongo.results.InsertOneResult: Result of the insert operation
         """
         document = self.safe_dump()
-        return self.__collection__.insert_one(document)
+        result = self.__collection__.insert_one(document)
+        self.uncache(result.inserted_id)
+        return result
+
+    # === Bulk ===
+
+    @staticmethod
+    def document(item: "WrapperModel | dict[str, Any]") -> dict[str, Any]:
+        """
+        Document to write for a model or an already serialized dict
+
+        Dicts are passed through untouched, which skips `safe_dump` entirely for callers
+        that already hold plain documents.
+        """
+        if isinstance(item, dict):
+            return item
+        return item.safe_dump()
+
+    @classmethod
+    def bulk_write(cls, ops: Iterable[Any], chunk_size: int = 1000, ordered: bool = False) -> BulkResult:
+        """
+        Sends pymongo write operations (`InsertOne`, `UpdateOne`, `DeleteOne`, ...) in chunks
+        of `chunk_size`, each chunk as a single `bulk_write` call.
+
+        Unordered chunks keep going past failing operations, their errors are collected in
+        :attr:`BulkResult.errors` instead of being raised.
+
+        :param Iterable[Any] ops: Write operations, consumed lazily
+        :param int chunk_size: Operations per round trip
+        :param bool ordered: Stop at the first error instead
+        :returns BulkResult: Counts, ids and errors by operation position
+        """
+
+        result = BulkResult()
+        ops = iter(ops)
+        offset = 0
+
+        # Whatever was written before an error or a stop went through, cached models may be stale
+        try:
+            while chunk := list(islice(ops, chunk_size)):
+                try:
+                    details = cls.__collection__.bulk_write(chunk, ordered=ordered).bulk_api_result
+                except BulkWriteError as error:
+                    details = error.details
+
+                result.inserted += details.get("nInserted", 0)
+                result.matched += details.get("nMatched", 0)
+                result.modified += details.get("nModified", 0)
+                result.deleted += details.get("nRemoved", 0)
+                result.upserted += details.get("nUpserted", 0)
+
+                for upsert in details.get("upserted", []):
+                    result.ids[offset + upsert["index"]] = upsert["_id"]
+
+                for write_error in details.get("writeErrors", []):
+                    result.errors[offset + write_error["index"]] = write_error
+
+                if ordered and result.errors:
+                    break
+
+                offset += len(chunk)
+        finally:
+            cls.uncache()
+
+        return result
+
+    @classmethod
+    def insert_many(cls, models: Iterable["Self | dict[str, Any]"], chunk_size: int = 1000) -> BulkResult:
+        """
+        Inserts many models, or plain documents, in unordered chunks
+
+        :param Iterable models: Models or documents to insert
+        :param int chunk_size: Documents per round trip
+        :returns BulkResult: Inserted ids and errors by input position
+        """
+
+        ids: dict[int, Any] = {}
+
+        def ops():
+            for index, model in enumerate(models):
+                document = cls.document(model)
+
+                # Assigned here so ids are known without reading them back
+                ids[index] = document.setdefault("_id", ObjectId())
+                yield InsertOne(document)
+
+        result = cls.bulk_write(ops(), chunk_size)
+        result.ids = {index: value for index, value in ids.items() if index not in result.errors}
+        return result
+
+    @classmethod
+    def upsert_many(cls, models: Iterable["Self | dict[str, Any]"], key: str | tuple[str, ...] = "id", chunk_size: int = 1000) -> BulkResult:
+        """
+        Inserts or updates many models, or plain documents, matched on `key`
+
+        Matching documents get the model's fields `$set`, fields that aren't on the model are
+        left alone. Documents without the key fields are reported as errors, not written.
+
+        :param Iterable models: Models or documents to upsert
+        :param str | tuple[str, ...] key: Field, or fields, identifying a document
+        :param int chunk_size: Documents per round trip
+        :returns BulkResult: Counts, upserted ids and errors by input position
+        """
+
+        keys = (key,) if isinstance(key, str) else key
+        missing: dict[int, dict[str, Any]] = {}
+
+        # Input position of every operation sent, skipped documents shift them
+        positions: list[int] = []
+
+        def ops():
+            for index, model in enumerate(models):
+                document = cls.document(model)
+                if any(field not in document for field in keys):
+                    missing[index] = {"index": index, "errmsg": f"Document is missing key fields {keys}"}
+                    continue
+
+                positions.append(index)
+                yield UpdateOne({field: document[field] for field in keys}, {"$set": document}, upsert=True)
+
+        result = cls.bulk_write(ops(), chunk_size)
+        result.ids = {positions[index]: value for index, value in result.ids.items()}
+        result.errors = {positions[index]: value for index, value in result.errors.items()}
+        result.errors.update(missing)
+        return result
 
     # === Retrieval & Existence ===
 
@@ -110,46 +516,334 @@ class WrapperModel(BaseModel):
         :returns Self: A model instance containing the document's data
         """
 
-        search = cls.__collection__.find_one(filters)
-        if not search:
-            raise LookupError(f"Failed to find document, filters: {filters}")
-        return cls(**search)
+        cache = cls.__cache__
+        if cache is None:
+            search = cls.__collection__.find_one(filters)
+            if not search:
+                raise LookupError(f"Failed to find document, filters: {filters}")
+            return cls.from_document(search)
+
+        cache.start_watcher(cls.__collection__)
+
+        key = cache.key(cls, filters)
+        instance = cache.get(key)
+        if instance is None:
+            search = cls.__collection__.find_one(filters)
+            if not search:
+                raise LookupError(f"Failed to find document, filters: {filters}")
+            instance = cls.from_document(search)
+            cache.put(key, search.get("_id"), instance)
+
+        # Callers own what they get, the cached instance is never handed out
+        return instance.model_copy(deep=True)
     
+    @overload
+    @classmethod
+    def random(cls, n: None = None, **filters) -> Optional[Self]: ...
+
+    @overload
     @classmethod
-    def random(cls) -> Optional[Self]:
+    def random(cls, n: int, **filters) -> list[Self]: ...
+
+    @classmethod
+    def random(cls, n: Optional[int] = None, **filters) -> Optional[Self] | list[Self]:
         """
-        Returns a random instance of itself, if there are no instances
-        within the database, then return None
-        
-        :returns Optional[Self]: Random instance of self or None
+        Returns random instances of itself drawn server-side with the `$sample` aggregation
+        stage, so the collection is never pulled into memory.
+
+        Without `n`, returns a single instance or None if nothing matches. With `n`, returns a
+        list of up to `n` instances in one round trip.
+
+        Backends that don't support `$sample` fall back to counting the matches and fetching
+        random offsets, one query per document.
+
+        Instances are distinct, so the list can hold fewer than `n` even when more documents
+        match: `$sample` may return a document more than once and repeats are dropped.
+
+        :param Optional[int] n: Amount of documents to draw
+        :param kwargs filters: MongoDB filter the documents must match
+        :returns Optional[Self] | list[Self]: Random instance or list of instances
+        """
+
+        size = 1 if n is None else n
+        if size <= 0:
+            return None if n is None else []
+
+        pipeline: list[dict[str, Any]] = [{"$match": filters}] if filters else []
+        pipeline.append({"$sample": {"size": size}})
+
+        try:
+            docs = list(cls.__collection__.aggregate(pipeline))
+        except (OperationFailure, NotImplementedError):
+            docs = cls.__random_by_offset(size, filters)
+
+        instances = [cls.from_document(doc) for doc in cls.sampled(docs)]
+
+        if n is None:
+            return instances[0] if instances else None
+        return instances
+
+    @staticmethod
+    def sampled(docs: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Random draw without the repeats, first occurrence of each `_id` kept
+
+        `$sample` picks documents with a random cursor when it can't sort the whole collection
+        randomly, which can yield a document twice, and the offset fallback shifts under
+        concurrent writes.
         """
-        
-        # Get entire collection as cursor
-        docs_cursor = cls.__collection__.find({})
-        
-        # Go through cursor and save to array
-        docs = [docs_item for docs_item in docs_cursor]
-        
-        return random.choice(docs) if len(docs) > 0 else None
+        seen: set[Any] = set()
+        unique = []
+        for doc in docs:
+            if doc.get("_id") in seen:
+                continue
+            seen.add(doc.get("_id"))
+            unique.append(doc)
+        return unique
 
     @classmethod
-    def exists(cls, **filters):
+    def __random_by_offset(cls, size: int, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Draws `size` distinct random documents by offset, for backends without `$sample`
+        """
+
+        count = cls.__collection__.count_documents(filters)
+
+        docs = []
+        for offset in random.sample(range(count), min(size, count)):
+            docs.extend(cls.__collection__.find(filters).skip(offset).limit(1))
+        return docs
+
+    @classmethod
+    def find(
+        cls,
+        projection: Optional[list[str]] = None,
+        batch_size: int = 500,
+        sort: Optional[list[tuple[str, int]]] = None,
+        limit: int = 0,
+        raw: bool = False,
+        **filters,
+    ) -> Iterator[Self]:
+        """
+        Lazily yields model instances of every document matching the filters
+
+        Documents are pulled from a pymongo cursor `batch_size` at a time, so iterating a large
+        collection runs in constant memory. With a `projection`, only the listed fields are
+        transferred and the instances are partial, see :meth:`from_projection`: fields outside
+        of the projection raise `AttributeError` when read and the instances can't be written whole.
+
+        :param Optional[list[str]] projection: Fields to fetch, everything if not given
+        :param int batch_size: Documents per round trip
+        :param Optional[list[tuple[str, int]]] sort: pymongo sort specification
+        :param int limit: Maximum amount of documents, 0 for no limit
+        :param bool raw: Yield the documents themselves, no model is built
+        :param kwargs filters: MongoDB filter to match documents
+        :returns Iterator[Self]: Model instances, one per document
+        """
+
+        cursor = cls.__collection__.find(filters, projection=projection, batch_size=batch_size, limit=limit)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        with cursor:
+            for document in cursor:
+                if raw:
+                    yield document
+                elif projection is None:
+                    yield cls.from_document(document)
+                else:
+                    yield cls.from_projection(document)
+
+    @classmethod
+    def page(
+        cls,
+        after: Any = None,
+        limit: int = 50,
+        key: str = "_id",
+        projection: Optional[list[str]] = None,
+        raw: bool = False,
+        **filters,
+    ) -> tuple[list[Self], Any]:
+        """
+        Keyset pagination, returns the page of documents following `after` in `key` order
+
+        Pages are selected with `key > after` rather than skipping, so fetching page N costs the
+        same as fetching the first one, as long as `key` is indexed. `key` must be unique.
+
+        When paginating on `_id`, `after` may be the string form of the ObjectId, which is also
+        what's returned as the next cursor so it can go straight into an API response.
+
+        Usage
+        -----
+        ```python
+        items, after = FileMeta.page(limit=100)
+        while after is not None:
+            items, after = FileMeta.page(after=after, limit=100)
+        ```
+
+        :param Any after: Cursor returned by the previous page, None for the first page
+        :param int limit: Page size, at least 1
+        :param str key: Unique field to paginate on
+        :param Optional[list[str]] projection: Fields to fetch, see :meth:`find`
+        :param bool raw: Return the documents themselves, no model is built
+        :param kwargs filters: MongoDB filter to match documents
+        :returns tuple[list[Self], Any]: The page and the cursor of the next page, None on the last page
+        :raises ValueError: If `limit` isn't positive, mongo reads 0 as no limit at all
+        """
+
+        if limit <= 0:
+            raise ValueError(f"Page size must be positive, got {limit}")
+
+        if key == "_id" and isinstance(after, str) and ObjectId.is_valid(after):
+            after = ObjectId(after)
+
+        if after is not None:
+            filters[key] = {"$gt": after}
+
+        # The key is needed to compute the next cursor
+        if projection is not None and key not in projection:
+            projection = [*projection, key]
+
+        cursor = cls.__collection__.find(filters, projection=projection, limit=limit).sort(key, 1)
+
+        documents = list(cursor)
+        if raw:
+            items = documents
+        elif projection is None:
+            items = [cls.from_document(document) for document in documents]
+        else:
+            items = [cls.from_projection(document) for document in documents]
+
+        if len(documents) < limit or not documents:
+            return items, None
+
+        last = documents[-1][key]
+        return items, str(last) if isinstance(last, ObjectId) else last
+
+    @staticmethod
+    def covering(filters: dict[str, Any]) -> dict[str, int]:
+        """
+        Projection returning only the filtered fields, without `_id` unless it's filtered on
+
+        With an index on those fields the server answers from the index alone (covered query)
+        and never fetches the document. Operator keys (`$or`, ...) can't be projected, filters
+        without plain fields fall back to `_id` only.
+        """
+        fields = sorted(key for key in filters if not key.startswith("$"))
+
+        # Projecting both `a` and `a.b` is a path collision
+        projection: dict[str, int] = {}
+        for key in fields:
+            if not any(key.startswith(f"{other}.") for other in projection):
+                projection[key] = 1
+
+        if not projection:
+            return {"_id": 1}
+        if "_id" not in projection:
+            projection["_id"] = 0
+        return projection
+
+    @classmethod
+    def exists(cls, **filters) -> bool:
         """
         Checks whether a document exists in the collection based on the provided filters
 
-        Executes a MongoDB `find_one` query and returns a boolean indicating whether
-        a document matching the filters was found.
+        Only the filtered fields are projected, so an index on them answers the query without
+        fetching or decoding the document.
 
         :param kwargs filters: MongoDB filter to locate the document
         :returns bool: True if a document exists, False otherwise
         """
 
-        if cls.__collection__.find_one(filters):
-            return True
-        return False
+        return cls.__collection__.find_one(filters, projection=cls.covering(filters)) is not None
+
+    @classmethod
+    def count(cls, limit: int = 0, **filters) -> int:
+        """
+        Counts the documents matching the filters, stopping at `limit` when given
+
+        `count(limit=n, ...) == n` answers "at least n" without scanning every match.
+
+        :param int limit: Maximum counted, 0 counts everything
+        :param kwargs filters: MongoDB filter
+        :returns int: Amount of matching documents, at most `limit`
+        """
+
+        if limit:
+            return cls.__collection__.count_documents(filters, limit=limit)
+        return cls.__collection__.count_documents(filters)
+
+    @staticmethod
+    def values_at(document: dict[str, Any], field: str) -> list[Any]:
+        """
+        Values found at a dotted path of a document, arrays are expanded like `$in` matches them
+        """
+        values: list[Any] = [document]
+        for part in field.split("."):
+            found = []
+            for value in values:
+                if isinstance(value, dict) and part in value:
+                    child = value[part]
+                    found.extend(child if isinstance(child, list) else [child])
+            values = found
+        return values
+
+    @classmethod
+    def exists_many(cls, values: Iterable[Any], field: str = "id", chunk_size: int = 1000, **filters) -> set[Any]:
+        """
+        Answers existence for many values of a field at once, one `$in` query per chunk
+
+        Covered by an index on `field`, meant for deduplicating batches before inserting them.
+
+        Usage
+        -----
+        ```python
+        known = FileMeta.exists_many(ids)
+        FileMeta.insert_many(meta for meta in metas if meta.id not in known)
+        ```
+
+        :param Iterable[Any] values: Values looked up
+        :param str field: Field the values are matched against
+        :param int chunk_size: Values per query
+        :param kwargs filters: Extra filter applied to every query
+        :returns set[Any]: The values that exist
+        """
+
+        wanted = list(dict.fromkeys(values))
+        found: set[Any] = set()
+        projection = {field: 1} if field == "_id" else {field: 1, "_id": 0}
+
+        for start in range(0, len(wanted), chunk_size):
+            chunk = wanted[start:start + chunk_size]
+            lookup = set(chunk)
+            for document in cls.__collection__.find({**filters, field: {"$in": chunk}}, projection=projection):
+                found.update(value for value in cls.values_at(document, field) if value in lookup)
+
+        return found
 
     # === Modification ===
 
+    def identity(self) -> dict[str, Any]:
+        """
+        Filter locating the current document, on `id` if the model has one, `_id` otherwise
+
+        :raises ValueError: If neither is set
+        """
+
+        key = "id"
+        value = None
+
+        if hasattr(self, "id"):
+            value = getattr(self, "id")
+        elif hasattr(self, "_id"):
+            value = getattr(self, "_id")
+            key = "_id"
+
+        if not value:
+            raise ValueError("No filter was specified and no conclusions could be drawn")
+
+        return {key: value}
+
     def update(self, filter: dict[str, Any] = None, operation: str = "", update: dict[str, Any] = {}) -> UpdateResult:
         """
         Updates a document in the given collection using the specified operation and filter
@@ -160,36 +854,114 @@ class WrapperModel(BaseModel):
         :returns pymongo.results.UpdateResult: Result object containing matched and modified counts
         """
 
+        custom = filter is not None
         if filter is None:
-            filtered_id = getattr(self, "id", None) or getattr(self, "_id", None) or None
-            key: bool = "id"
-            value = None
+            filter = self.identity()
+
+        result = self.__collection__.update_one(filter, {operation: update})
+        self.uncache(None if custom else self.cached_id())
+        return result
+
+    def set(self, update: dict[str, Any], local: bool = False, **filters) -> None:
+        """
+        Applies a set operation to the document in the database and brings the model up to date
+
+        By default this is a single `find_one_and_update` round trip returning the updated
+        document. With `local`, the update is sent with `update_one` and applied to the model
+        in memory without reading anything back, other fields changed concurrently in the
+        database are then not picked up.
+
+        :param dict[str, Any] update: Fields and values to update in the document, dotted paths are allowed
+        :param bool local: Apply the update in memory instead of reading the document back
+        :param kwargs filters: MongoDB filter to locate the target document
+        :raises LookupError: If no matching document is found
+        """
+        custom = bool(filters)
+        if not filters:
+            filters = self.identity()
+
+        if local:
+            result = self.__collection__.update_one(filters, {"$set": update})
+            self.uncache(None if custom else self.cached_id())
+            if not result.matched_count:
+                raise LookupError(f"Failed to find document, filters: {filters}")
 
-            if hasattr(self, "id"):
-                value = getattr(self, "id")
-            elif hasattr(self, "_id"):
-                value = getattr(self, "_id")
-                key = "_id"
+            self.apply_set(update)
+            return
 
-            if not value:
-                raise ValueError("No filter was specified and no conclusions could be drawn")
+        document = self.__collection__.find_one_and_update(filters, {"$set": update}, return_document=ReturnDocument.AFTER)
+        if not document:
+            raise LookupError(f"Failed to find document, filters: {filters}")
 
-            filter = {key: value}
+        self.uncache(document.get("_id"))
+        self.load(document)
 
-        return self.__collection__.update_one(filter, {operation: update})
+    def apply_set(self, update: dict[str, Any]) -> None:
+        """
+        Applies a `$set` document to the model in memory, the assigned fields aren't dirty afterwards
+        """
+        for path, value in update.items():
+            self.__assign(path, value)
+        self._dirty.difference_update(path.split(".")[0] for path in update)
 
-    def set(self, update: dict[str, Any], **filters) -> None:
+    def __assign(self, path: str, value: Any) -> None:
+        """
+        Assigns a `$set` style dotted path in memory
         """
-        Applies a set operation to the user document in the database
+        first, *rest = path.split(".")
+        if not rest:
+            if first in type(self).model_fields:
+                self.__dict__[first] = value
+            else:
+                self.__pydantic_extra__[first] = value
+            return
+
+        target = getattr(self, first)
+        for part in rest[:-1]:
+            target = target.setdefault(part, {}) if isinstance(target, dict) else getattr(target, part)
+
+        if isinstance(target, dict):
+            target[rest[-1]] = value
+        else:
+            setattr(target, rest[-1], value)
+
+    def save(self, **filters) -> Optional[UpdateResult]:
+        """
+        Sends the fields assigned since the model was loaded or last saved as a single `$set`
+
+        Only assignments are tracked, in-place changes like `model.tags.append(...)` need the
+        field to be reassigned or :meth:`set` to be used.
 
-        :param dict[str, Any] update: Fields and values to update in the document
         :param kwargs filters: MongoDB filter to locate the target document
+        :raises ValueError: If the instance is partial, see :meth:`from_projection`
+        :returns Optional[UpdateResult]: Result of the update, None if nothing changed
         """
-        if not filters and hasattr(self, "id"):
-            filters = {"id": self.id}
+        self.require_complete("save")
+        if not self._dirty:
+            return None
+
+        custom = bool(filters)
+        if not filters:
+            filters = self.identity()
 
-        self.update(filters, "$set", update)
-        self.refresh()
+        changes = self.model_dump(include=set(self._dirty))
+        changes.pop("_id", None)
+
+        result = self.__collection__.update_one(filters, {"$set": changes})
+        self.uncache(None if custom else self.cached_id())
+        self._dirty.clear()
+        return result
+
+    def load(self, document: dict[str, Any]) -> None:
+        """
+        Replaces the model's fields with the given database document
+        """
+        new = self.from_document(document)
+        self.__dict__.update(new.__dict__)
+        object.__setattr__(self, "__pydantic_extra__", new.__pydantic_extra__)
+        object.__setattr__(self, "__pydantic_fields_set__", new.__pydantic_fields_set__)
+        self._loaded = None
+        self._dirty.clear()
 
     def refresh(self, **filters) -> None:
         """
@@ -198,12 +970,17 @@ class WrapperModel(BaseModel):
         Uses the provided filters to query the document from the collection and replaces
         all internal fields on the model with the retrieved values.
 
-        :param kwargs filters: MongoDB filter used to locate the current document
+        :param kwargs filters: MongoDB filter used to locate the current document, defaults to :meth:`identity`
         :raises LookupError: If no matching document is found
         """
 
-        new = self.get(**filters).model_dump()
-        self.__dict__.update(new)
+        if not filters:
+            filters = self.identity()
+
+        search = self.__collection__.find_one(filters)
+        if not search:
+            raise LookupError(f"Failed to find document, filters: {filters}")
+        self.load(search)
 
     # === Deletion ===
 
@@ -220,8 +997,11 @@ class WrapperModel(BaseModel):
         """
 
         if self._id:
-            return self.__collection__.delete_one({"_id": self._id})
+            result = self.__collection__.delete_one({"_id": self._id})
         elif hasattr(self, "id") and self.id:
-            return self.__collection__.delete_one({"id": self.id})
+            result = self.__collection__.delete_one({"id": self.id})
+        else:
+            raise LookupError("Current document has no identifier (missing both `_id` and `id`)")
 
-        raise LookupError("Current document has no identifier (missing both `_id` and `id`)")
+        self.uncache(self.cached_id())
+        return result
@@ -0,0 +1,226 @@
+# === Core ===
+import os
+import time
+import threading
+from collections import OrderedDict
+from pymongo.errors import OperationFailure, PyMongoError
+
+# === Utils ===
+from utils.console import console
+
+# === Typing ===
+from typing import Any, ClassVar, Hashable, Iterable, Optional
+from pymongo.collection import Collection
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Hashable, order independent form of a filter value, `{"a": 1, "b": 2} == {"b": 2, "a": 1}`
+    """
+    if isinstance(value, dict):
+        return ("__dict__", tuple(sorted((str(key), freeze(child)) for key, child in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ("__list__", tuple(freeze(child) for child in value))
+    if isinstance(value, set):
+        return ("__set__", tuple(sorted((freeze(child) for child in value), key=repr)))
+    try:
+        hash(value)
+    except TypeError:
+        return ("__repr__", repr(value))
+    return value
+
+
+class ModelCache:
+    """
+    Bounded LRU cache with TTL of model instances, keyed on the filters they were fetched with.
+
+    Opt-in per model through `__cache__`, used by `get()` and invalidated by the model's own
+    writes: entries of a document are dropped by `_id` when it's known, the whole cache is
+    cleared otherwise. Writes made elsewhere (other workers, other services) are only seen
+    once entries expire, unless `watch` is set and the server supports change streams
+    (replica sets and sharded clusters).
+
+    Usage
+    -----
+    ```python
+    class FileMeta(WrapperModel):
+        __collection__ = MongoClient.file_metas
+        __cache__ = ModelCache(maxsize=4096, ttl=30)
+    ```
+    """
+
+    # Every cache, rendered by render_all()
+    caches: ClassVar[list["ModelCache"]] = []
+
+    # Seconds before reopening a failed change stream, doubled on every failure up to retry_max
+    retry_delay: ClassVar[float] = 1.0
+    retry_max: ClassVar[float] = 60.0
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, watch: bool = False) -> None:
+        """
+        :param int maxsize: Maximum amount of cached instances, least recently used go first
+        :param float ttl: Seconds an instance is served from the cache
+        :param bool watch: Invalidates from a change stream on the collection, across workers
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.watch = watch
+        self.name: str = "model"
+
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[Hashable, tuple[float, Any, Any]] = OrderedDict()
+        self.by_id: dict[Hashable, set[Hashable]] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.invalidations: int = 0
+
+        self.__watcher_pid: Optional[int] = None
+
+        ModelCache.caches.append(self)
+
+    @staticmethod
+    def key(model: type, filters: dict[str, Any]) -> Hashable:
+        return (model.__qualname__, freeze(filters))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Cached instance for a key, None on a miss or if it expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, _id, value = entry
+            if expires < time.monotonic():
+                self.__drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, _id: Any, value: Any) -> None:
+        """
+        Caches an instance, `_id` is what invalidation finds it by
+        """
+        with self.lock:
+            if key in self.entries:
+                self.__drop(key)
+
+            _id = freeze(_id)
+            self.entries[key] = (time.monotonic() + self.ttl, _id, value)
+            if _id is not None:
+                self.by_id.setdefault(_id, set()).add(key)
+
+            while len(self.entries) > self.maxsize:
+                self.__drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def __drop(self, key: Hashable) -> None:
+        _, _id, _ = self.entries.pop(key)
+        keys = self.by_id.get(_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_id[_id]
+
+    def invalidate(self, _id: Any = None) -> None:
+        """
+        Drops the entries of a document, or every entry when `_id` is None
+        """
+        with self.lock:
+            self.invalidations += 1
+            if _id is None:
+                self.entries.clear()
+                self.by_id.clear()
+                return
+
+            for key in list(self.by_id.get(freeze(_id), ())):
+                self.__drop(key)
+
+    # === Change streams ===
+
+    def start_watcher(self, collection: Collection) -> None:
+        """
+        Starts the change stream watcher of the current process, if enabled and not running yet
+        """
+        if not self.watch or self.__watcher_pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.__watcher_pid == os.getpid():
+                return
+            self.__watcher_pid = os.getpid()
+
+        threading.Thread(target=self.__watch, args=(collection,), name=f"cache-watch-{self.name}", daemon=True).start()
+
+    @staticmethod
+    def unsupported(error: PyMongoError) -> bool:
+        """
+        Whether the server can't run change streams at all (standalone), rather than failed for now
+        """
+        return isinstance(error, OperationFailure) and (error.code == 40573 or "only supported on replica sets" in str(error))
+
+    def __watch(self, collection: Collection) -> None:
+        """
+        Change stream loop, reopened with backoff when the stream fails or ends
+
+        Failovers, network errors and `invalidate` events end the stream, pymongo only resumes
+        it once on its own. Standalone servers stop the watcher for good, entries then only
+        expire through their TTL.
+        """
+        delay = self.retry_delay
+        while True:
+            try:
+                with collection.watch(max_await_time_ms=1000) as stream:
+                    delay = self.retry_delay
+                    for change in stream:
+                        operation = change.get("operationType")
+                        if operation in ("update", "replace", "delete"):
+                            self.invalidate(change["documentKey"]["_id"])
+                        elif operation in ("drop", "rename", "dropDatabase", "invalidate"):
+                            self.invalidate()
+            except PyMongoError as error:
+                if self.unsupported(error):
+                    console.warn(f"Cache: no change streams for {self.name}, entries only expire through their TTL")
+                    self.invalidate()
+                    return
+                console.warn(f"Cache: change stream on {self.name} stopped, reopening in {delay:g}s, {error}")
+
+            # The stream is gone, what happened meanwhile is unknown
+            self.invalidate()
+            time.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+
+    # === Instrumentation ===
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "size": len(self.entries),
+        }
+
+    @classmethod
+    def render_all(cls) -> Iterable[str]:
+        """
+        Counters of every cache in the prometheus text format, usable as a metrics collector
+        """
+        if not cls.caches:
+            return
+
+        counters = [(cache.name, cache.counters()) for cache in cls.caches]
+        for metric in ("hits", "misses", "evictions", "expirations", "invalidations", "size"):
+            yield f"# TYPE model_cache_{metric} {'gauge' if metric == 'size' else 'counter'}"
+            for name, values in counters:
+                yield f'model_cache_{metric}{{model="{name}"}} {values[metric]}'
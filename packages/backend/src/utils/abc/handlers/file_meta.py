@@ -0,0 +1,21 @@
+# === Utils ===
+from utils.mongo.Client import MongoClient
+from utils.abc.handlers.base import WrapperModel
+from utils.abc.handlers.indexes import Index
+
+# === Typing ===
+from typing import ClassVar
+from pymongo.collection import Collection
+
+
+class FileMeta(WrapperModel):
+    """
+    Metadata document of a stored file, bound to the `file_metas` collection
+    """
+
+    __collection__: ClassVar[Collection] = MongoClient.file_metas
+    __indexes__: ClassVar[list[Index]] = [
+        # get / exists / delete / identity() all look documents up by id. `id` isn't a declared
+        # field, so the index isn't unique and skips documents without one
+        Index("id", partial={"id": {"$exists": True}}),
+    ]
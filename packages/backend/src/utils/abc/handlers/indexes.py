@@ -0,0 +1,144 @@
+# === Core ===
+from dataclasses import dataclass, field
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# === Utils ===
+from utils.console import console
+
+# === Typing ===
+from typing import Any, Iterable, Optional, Union
+from pymongo.collection import Collection
+
+
+@dataclass(frozen=True, init=False)
+class Index:
+    """
+    Index declaration of a :class:`WrapperModel`, listed in its `__indexes__`
+
+    Usage
+    -----
+    ```python
+    class FileMeta(WrapperModel):
+        __collection__ = MongoClient.file_metas
+        __indexes__ = [
+            Index("id", unique=True),                   # single field, unique
+            Index("name", partial={"name": {"$exists": True}}),  # only documents holding the field
+            Index("owner", ("created", -1)),            # compound, created descending
+            Index("expire_at", expire_after=0),         # TTL, expires at the date stored in the field
+        ]
+    ```
+    """
+
+    keys: tuple[tuple[str, Union[int, str]], ...]
+    unique: bool = False
+    expire_after: Optional[int] = None
+    sparse: bool = False
+    partial: Optional[dict[str, Any]] = None
+    name: Optional[str] = field(default=None)
+
+    def __init__(
+        self,
+        *keys: Union[str, tuple[str, Union[int, str]]],
+        unique: bool = False,
+        expire_after: Optional[int] = None,
+        sparse: bool = False,
+        partial: Optional[dict[str, Any]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        """
+        :param keys: Field names (ascending) or `(field, direction)` pairs, in index order
+        :param bool unique: Rejects documents duplicating the indexed values
+        :param Optional[int] expire_after: TTL in seconds, only on a single date field
+        :param bool sparse: Skips documents missing the field
+        :param Optional[dict[str, Any]] partial: Only indexes documents matching this filter
+        :param Optional[str] name: Index name, mongo's `field_direction` naming if not given
+        """
+        if not keys:
+            raise ValueError("An index needs at least one key")
+
+        normalized = tuple((key, ASCENDING) if isinstance(key, str) else (key[0], key[1]) for key in keys)
+        if expire_after is not None and len(normalized) != 1:
+            raise ValueError("TTL indexes can only have a single key")
+
+        object.__setattr__(self, "keys", normalized)
+        object.__setattr__(self, "unique", unique)
+        object.__setattr__(self, "expire_after", expire_after)
+        object.__setattr__(self, "sparse", sparse)
+        object.__setattr__(self, "partial", partial)
+        object.__setattr__(self, "name", name or "_".join(f"{key}_{direction}" for key, direction in normalized))
+
+    def options(self) -> dict[str, Any]:
+        """
+        Creation options, in the shape `index_information()` reports them
+        """
+        options: dict[str, Any] = {}
+        if self.unique:
+            options["unique"] = True
+        if self.expire_after is not None:
+            options["expireAfterSeconds"] = self.expire_after
+        if self.sparse:
+            options["sparse"] = True
+        if self.partial is not None:
+            options["partialFilterExpression"] = self.partial
+        return options
+
+    def model(self) -> IndexModel:
+        return IndexModel(list(self.keys), name=self.name, **self.options())
+
+
+def sync_indexes(collection: Collection, indexes: Iterable[Index]) -> list[str]:
+    """
+    Creates the declared indexes missing from a collection
+
+    Existing indexes are matched on their keys. One whose options differ is left alone and
+    reported, rebuilding it is a manual decision, except for a changed TTL which is applied
+    in place through `collMod`. Indexes that aren't declared are never dropped.
+
+    Index builds don't block reads and writes on the collection for their duration (mongo 4.2+
+    only locks it at the start and end of the build), so this is safe on a live collection.
+
+    :param Collection collection: Target collection
+    :param Iterable[Index] indexes: Declared indexes
+    :returns list[str]: Names of the created indexes
+    """
+    existing = {tuple((key, direction) for key, direction in info["key"]): (name, info) for name, info in collection.index_information().items()}
+
+    missing: list[Index] = []
+    for index in indexes:
+        found = existing.get(tuple(index.keys))
+        if found is None:
+            missing.append(index)
+            continue
+
+        name, info = found
+        options = index.options()
+        current = {key: info[key] for key in ("unique", "expireAfterSeconds", "sparse", "partialFilterExpression") if key in info}
+
+        if options == current:
+            continue
+
+        without_ttl = {key: value for key, value in options.items() if key != "expireAfterSeconds"}
+        current_without_ttl = {key: value for key, value in current.items() if key != "expireAfterSeconds"}
+        if without_ttl == current_without_ttl and "expireAfterSeconds" in options and "expireAfterSeconds" in current:
+            collection.database.command("collMod", collection.name, index={"name": name, "expireAfterSeconds": index.expire_after})
+            console.info(f"Index: {collection.full_name}.{name} TTL set to {index.expire_after}s")
+            continue
+
+        console.warn(f"Index: {collection.full_name}.{name} exists with options {current}, declared {options}, drop it to rebuild")
+
+    if not missing:
+        return []
+
+    # One by one, an index that can't be built (duplicates under a unique index) doesn't hold back the others
+    created: list[str] = []
+    for index in missing:
+        try:
+            collection.create_indexes([index.model()])
+        except OperationFailure as error:
+            console.error(f"Index: failed to create {collection.full_name}.{index.name}: {error}")
+            continue
+        console.info(f"Index: created {collection.full_name}.{index.name}")
+        created.append(index.name)
+
+    return created
@@ -0,0 +1,57 @@
+# === Core ===
+import secrets
+from datetime import datetime, timedelta, timezone
+
+# === Utils ===
+from utils.helper.time import future, now
+from utils.mongo.Client import MongoClient
+from utils.abc.handlers.base import WrapperModel
+from utils.abc.handlers.async_base import AsyncWrapperModel
+from utils.abc.handlers.indexes import Index
+
+# === Typing ===
+from typing import ClassVar, Self
+from pymongo.collection import Collection
+
+
+class Session(WrapperModel):
+    """
+    Login session, bound to the `sessions` collection
+
+    `id` is the token handed to the client. Mongo's TTL monitor removes expired sessions
+    through `expire_at`, it runs about once a minute so readers also check `expires`.
+    """
+
+    __collection__: ClassVar[Collection] = MongoClient.sessions
+    __indexes__: ClassVar[list[Index]] = [
+        Index("id", unique=True),
+        Index("expire_at", expire_after=0),
+    ]
+
+    id: str
+    created: int
+    expires: int
+    expire_at: datetime
+
+    @classmethod
+    def new(cls, lifetime: timedelta, **fields) -> Self:
+        """
+        Creates a session with a fresh random token, without storing it
+
+        :param timedelta lifetime: Time until the session expires
+        :param kwargs fields: Extra fields stored with the session
+        """
+        expires = future(lifetime)
+        return cls.create(
+            id=secrets.token_urlsafe(32),
+            created=now(),
+            expires=expires,
+            expire_at=datetime.fromtimestamp(expires, timezone.utc),
+            **fields,
+        )
+
+
+class AsyncSession(AsyncWrapperModel, Session):
+    """
+    :class:`Session` with the awaitable methods of :class:`AsyncWrapperModel`
+    """
@@ -1,18 +1,36 @@
 # === Core ===
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
 from pathlib import Path
 
+import os
+import sys
+import time
+import logging
+import threading
+import importlib
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
 
 # === Utils ===
 from utils.console import console
-from utils.helper.config import Yaml
+from utils.helper.config import ConfigSnapshot, ConfigWatcher, Yaml
+from utils.mongo.Client import MongoClient
+from utils.abc.handlers.base import WrapperModel
+from utils.abc.handlers.cache import ModelCache
+from .Metrics import Metrics, MetricsMiddleware
+from .Profiler import ProfilerMiddleware, Sampler
+from .Routers import DeferredRouterMiddleware, RouteManifest
+from utils.server import server_config
 
 # === Typing ===
-from typing import Any, Dict, List, Union
+from typing import Annotated, Any, Dict, List, Optional, Set
+from types import ModuleType
 from importlib.machinery import ModuleSpec
+from pymongo.errors import PyMongoError
 
 
 class App(FastAPI):
@@ -22,11 +40,78 @@ class App(FastAPI):
         self.main: Path = Path(file_path)
         self.root = self.main.parent
 
-        # Routers
+        # Routers, by module name
         self.routers: Dict[str, Any] = {}
 
+        # Seconds spent importing and registering each router module
+        self.startup_report: Dict[str, float] = {}
+
         super().__init__(*args, **kwargs)
 
+        # Config hot reload, picked up without re-reading the file per request
+        self.config_watcher = ConfigWatcher(Yaml())
+        self.config_watcher.polling = bool(self.config_watcher.get("backend.config.polling", default=False))
+        self.config_watcher.interval = float(self.config_watcher.get("backend.config.interval", default=1.0) or 1.0)
+        self.config_watcher.subscribe("backend.uvicorn_config.log_level")(self.__on_log_level)
+        self.router.on_startup.append(self.config_watcher.start)
+        self.router.on_shutdown.append(self.config_watcher.stop)
+
+        # Request instrumentation, exposed by register_routers
+        self.metrics = Metrics()
+        self.metrics_path: str | None = None
+        if self.config_watcher.get("backend.metrics.enabled", default=True):
+            self.metrics_path = self.config_watcher.get("backend.metrics.path", default="/metrics")
+            self.add_middleware(MetricsMiddleware, metrics=self.metrics)
+            self.metrics.collectors.append(MongoClient.pool_stats.render)
+            self.metrics.collectors.append(ModelCache.render_all)
+
+        # Opt-in profiling, exposed by register_routers
+        self.profiling: bool = bool(self.config_watcher.get("backend.profiling.enabled", default=False))
+        self.profile_token: Optional[str] = self.config_watcher.get("backend.profiling.token", default=None) or None
+        self.profile_directory = Path(self.config_watcher.get("backend.profiling.directory", default="/logs/.profiles"))
+        self.profile_prefix: str = self.config_watcher.get("backend.profiling.prefix", default="/_profile")
+        if self.profiling:
+            retention = self.config_watcher.get("backend.profiling.retention", default=100)
+            self.add_middleware(ProfilerMiddleware, directory=self.profile_directory, token=self.profile_token, retention=retention)
+
+        # Router discovery manifest and deferred router modules, see register_routers
+        manifest = self.config_watcher.get("backend.routers.manifest", default=".routes.json")
+        self.manifest = RouteManifest(self.root, self.root / manifest if manifest else None)
+        self.deferred: List[str] = list(self.config_watcher.get("backend.routers.deferred", default=[]) or [])
+        self.prewarm: int = int(self.config_watcher.get("backend.routers.prewarm", default=0) or 0)
+
+        # Declared model indexes, synced once the routers (and the models they use) are imported
+        if self.config_watcher.get("backend.indexes.ensure_on_startup", default=True):
+            self.router.on_startup.append(self.__ensure_indexes)
+
+    @staticmethod
+    def __ensure_indexes() -> None:
+        """
+        Creates missing model indexes in a background thread, startup doesn't wait on the database
+        """
+
+        def run() -> None:
+            try:
+                WrapperModel.ensure_all_indexes()
+            except PyMongoError as error:
+                console.error(f"Index: sync failed, {error}")
+
+        threading.Thread(target=run, name="ensure-indexes", daemon=True).start()
+
+    @staticmethod
+    def __on_log_level(changed: Set[str], snapshot: ConfigSnapshot) -> None:
+        """
+        Applies a changed `backend.uvicorn_config.log_level` to the running uvicorn loggers
+        """
+        level = snapshot.index.get("backend.uvicorn_config.log_level")
+        if not isinstance(level, str):
+            return
+
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access", "uvicorn.asgi"):
+            logging.getLogger(name).setLevel(level.upper())
+
+        console.info(f"Log level changed to [orange1]{level}[/]")
+
     def __try_resolve(self, name: str, package: str | None = None) -> str | None:
         """
         Uses the builtin `importlib` module's `util.resolve_name` method, just a more concise way of using it, if the return value
@@ -41,70 +126,251 @@ class App(FastAPI):
             console.error(f"Import error (name:str): {name} && (package: str | None): {package}, Error: ({e})")
             return None
 
-    def __load(self, spec: Union[str, ModuleSpec]) -> None:
+    def __load(self, module: str, file: Optional[Path] = None) -> Optional[APIRouter]:
         """
-        Imports and attempts to load a router variable in each spec if it exists
+        Imports a router module and registers its `router` variable if it exists
 
-        :param Union[str, ModuleSpec] spec: Spec string or object
-        """
+        Loading is idempotent: a module already in `sys.modules` (imported by another router,
+        or prewarmed) is reused instead of executed again, and a router is only included once.
 
-        if isinstance(spec, str):
-            spec: ModuleSpec | None = importlib.util.find_spec(
-                self.__try_resolve(spec, package=None)
-            )
+        :param str module: Module name, relative to the app root
+        :param Optional[Path] file: Module file when already known, skips resolving the spec through the import system
+        :returns Optional[APIRouter]: The registered router
+        """
+        if module in self.routers:
+            return self.routers[module]
 
-        if spec is None:
-            return None
+        start = time.perf_counter()
 
-        # Find and execute module
-        mod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(mod)
+        mod = sys.modules.get(module)
+        if mod is None:
+            mod = self.__import(module, file)
+            if mod is None:
+                return None
 
         external_router: Any = getattr(mod, "router", None)
 
         if external_router is None:
-            console.warn(f"No router variable found in [orange1 underline]{spec.name.replace('.', '/')}.py[/]")
+            console.warn(f"No router variable found in [orange1 underline]{module.replace('.', '/')}.py[/]")
             return None
 
         if not isinstance(external_router, APIRouter):
-            console.warn(f"Provided router variable isn't of type APIRouter in [orange1 underline]{spec.name.replace('.', '/')}.py[/]")
+            console.warn(f"Provided router variable isn't of type APIRouter in [orange1 underline]{module.replace('.', '/')}.py[/]")
             return None
 
         self.include_router(external_router)
-        
+        self.routers[module] = external_router
+        self.startup_report[module] = time.perf_counter() - start
+
         for route in external_router.routes:
-            console.info(f"Registered Route: [orange1]{route.path} [{', '.join(route.methods)}][/]")
+            console.debug(f"Registered Route: [orange1]{route.path} [{', '.join(getattr(route, 'methods', None) or ['WS'])}][/]")
+
+        return external_router
+
+    def __import(self, module: str, file: Optional[Path] = None) -> Optional[ModuleType]:
+        """
+        Executes a router module the way the import system would, registered in `sys.modules`
+        before it runs so its own imports (and later `import api...` statements) find it
+
+        A module whose file is already loaded under another name (`src.api.users` against
+        `api.users`) would run its side effects twice, that module is reused and reported.
+        """
+        if file is not None:
+            spec: ModuleSpec | None = importlib.util.spec_from_file_location(module, file)
+        else:
+            spec = importlib.util.find_spec(
+                self.__try_resolve(module, package=None)
+            )
+
+        if spec is None:
+            return None
+
+        duplicate = self.__imported_as(module, spec.origin)
+        if duplicate is not None:
+            console.warn(f"Router module [orange1]{module}[/] already imported as [orange1]{duplicate.__name__}[/], reusing it")
+            return duplicate
+
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = mod
+        try:
+            spec.loader.exec_module(mod)
+        except BaseException:
+            sys.modules.pop(spec.name, None)
+            raise
+
+        return mod
+
+    @staticmethod
+    def __imported_as(module: str, origin: Optional[str]) -> Optional[ModuleType]:
+        """
+        Module already loaded from `origin` under a name ending like `module`, None if there's none
+        """
+        if origin is None:
+            return None
+
+        suffix = f".{module}"
+        origin = os.path.realpath(origin)
+        for name, loaded in list(sys.modules.items()):
+            if name.endswith(suffix) and getattr(loaded, "__file__", None) and os.path.realpath(loaded.__file__) == origin:
+                return loaded
+        return None
+
+    def __prewarm(self, modules: Dict[str, Path]) -> None:
+        """
+        Imports router modules on a thread pool ahead of their registration
+
+        Concurrent imports of different modules are safe, the import system locks per module.
+        Compiling and executing module bodies still holds the GIL, what overlaps is the file
+        system work (finding, stat-ing and reading sources and their dependencies), which is
+        what dominates on cold caches and network mounts. A module failing here is left out of
+        `sys.modules` and fails again, with its traceback, during registration.
+
+        :param Dict[str, Path] modules: Module files, by module name
+        """
+        # Imported under another name, registration reuses those instead
+        names = [module for module, file in modules.items() if self.__imported_as(module, str(file)) is None]
+
+        def load(module: str) -> Optional[BaseException]:
+            try:
+                importlib.import_module(module)
+            except Exception as error:
+                return error
+            return None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.prewarm, thread_name_prefix="router-prewarm") as pool:
+            for module, error in zip(names, pool.map(load, names)):
+                if error is not None:
+                    console.warn(f"Routers: prewarm of [orange1]{module}[/] failed, {error}")
+
+        console.debug(f"Routers: prewarmed {len(names)} modules on {self.prewarm} threads in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    def __is_deferred(self, module: str) -> bool:
+        return any(module == name or module.startswith(f"{name}.") for name in self.deferred)
+
+    def __load_deferred(self, module: str) -> None:
+        """
+        Loads a deferred router module on the first request under its prefix
+        """
+        self.__load(module, self.root / self.manifest.modules[module]["file"])
+
+        # Regenerated with the new routes on the next /openapi.json
+        self.openapi_schema = None
+        console.info(f"Routers: loaded deferred [orange1]{module}[/] in {self.startup_report.get(module, 0) * 1e3:.1f} ms")
 
     def register_routers(self) -> None:
         """
         Actively finds and registers all routers lazily
+
+        Discovery goes through the route manifest when it's still valid. Modules listed in
+        `backend.routers.deferred` (or below them) whose prefix the manifest knows are only
+        imported on the first request under that prefix.
         """
-        for possible_router in self.__get_routers():
-            self.__load(possible_router)
+        start = time.perf_counter()
+
+        modules = self.manifest.load()
+        warm = modules is not None
+        if not warm:
+            modules = self.manifest.scan()
+
+        discovery = time.perf_counter() - start
+
+        pending: Dict[str, List[str]] = {}
+        eager: List[str] = []
+        for module, entry in modules.items():
+            prefix = entry.get("prefix")
+            if warm and prefix and self.__is_deferred(module):
+                pending.setdefault(prefix, []).append(module)
+            else:
+                eager.append(module)
 
-    def __get_routers(self) -> List[Any]:
-        out_specs = []
+        if self.prewarm > 1:
+            self.__prewarm({module: self.root / modules[module]["file"] for module in eager if module not in sys.modules})
+
+        for module in eager:
+            entry = modules[module]
+            router = self.__load(module, self.root / entry["file"] if warm else None)
+            if router is not None and not warm:
+                self.manifest.record(module, ((route.path, list(getattr(route, "methods", None) or [])) for route in router.routes))
+
+        if not warm:
+            self.manifest.save()
+
+        if pending:
+            self.add_middleware(DeferredRouterMiddleware, pending=pending, load=self.__load_deferred)
+
+        if self.metrics_path:
+            self.include_router(self.__metrics_router())
+            console.debug(f"Registered Route: [orange1]{self.metrics_path} [GET][/]")
+
+        if self.profiling:
+            self.include_router(self.__profiling_router())
+            console.debug(f"Registered Route: [orange1]{self.profile_prefix}/* [GET][/]")
+
+        self.__report(time.perf_counter() - start, discovery, warm, sum(len(modules) for modules in pending.values()))
+
+    def __report(self, total: float, discovery: float, warm: bool, deferred: int) -> None:
+        """
+        Logs the startup time report, the slowest modules first
+        """
+        routes = sum(len(router.routes) for router in self.routers.values())
+        source = "manifest" if warm else "scan"
+        console.info(
+            f"Routers: {len(self.routers)} modules, {routes} routes in {total * 1e3:.1f} ms "
+            f"({source} {discovery * 1e3:.1f} ms, {deferred} deferred)"
+        )
+
+        for module, seconds in sorted(self.startup_report.items(), key=lambda item: item[1], reverse=True):
+            console.debug(f"Routers: {module:<40} {seconds * 1e3:>8.1f} ms")
+
+    def __metrics_router(self) -> APIRouter:
+        """
+        Router exposing :attr:`metrics` in the prometheus text format
+        """
+        router = APIRouter()
+
+        @router.get(self.metrics_path, include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(self.metrics.render(), media_type="text/plain; version=0.0.4")
+
+        return router
+
+    def __profiling_router(self) -> APIRouter:
+        """
+        Router exposing the profiling admin endpoints
+
+        - `GET {prefix}/sample?seconds=10&interval=0.005` samples every thread of the worker
+          handling the request and returns collapsed stacks for flame graphs
+        - `GET {prefix}/requests/{profile_id}` returns the report of a profiled request
+        """
+        router = APIRouter(prefix=self.profile_prefix, include_in_schema=False)
 
-        api_route = self.root / "api"
+        def authorize(token: str | None) -> None:
+            if self.profile_token and token != self.profile_token:
+                raise HTTPException(status.HTTP_403_FORBIDDEN, "Invalid profile token")
 
-        files = api_route.rglob("*.py")
+        @router.get("/sample")
+        async def sample(seconds: float = 10.0, interval: float = 0.005, x_profile_token: Annotated[str | None, Header()] = None):
+            authorize(x_profile_token)
 
-        for file in files:
+            if not 0 < seconds <= 120 or not 0.0005 <= interval <= 1:
+                raise HTTPException(status.HTTP_400_BAD_REQUEST, "seconds must be within (0, 120] and interval within [0.0005, 1]")
 
-            # Skip files that start with _
-            if file.name.startswith("_"):
-                continue
+            # Sampled from a worker thread so the event loop keeps running, and shows up in the samples
+            collapsed = await run_in_threadpool(Sampler(interval).run, seconds)
+            return PlainTextResponse(collapsed, headers={"x-profile-pid": str(os.getpid())})
 
-            # Skip files in directories or files starting with _
-            if any(part.startswith("_") for part in file.parts):
-                continue
+        @router.get("/requests/{profile_id}")
+        async def request_report(profile_id: str, limit: int = 50, x_profile_token: Annotated[str | None, Header()] = None):
+            authorize(x_profile_token)
 
-            module_path = ".".join(file.relative_to(self.root).with_suffix("").parts)
-            out_specs.append(module_path)
+            report = ProfilerMiddleware.report(self.profile_directory, profile_id, limit)
+            if report is None:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, "No such profile")
+            return PlainTextResponse(report)
 
-        return out_specs
+        return router
 
     @property
     def config(self) -> dict:
-        yml = Yaml()
-        return yml.populate_environment(yml.get("backend.uvicorn_config"))
+        return server_config()
@@ -0,0 +1,185 @@
+# === Core ===
+import time
+from bisect import bisect_left
+from starlette.routing import Match
+
+# === Typing ===
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Response size buckets in bytes
+SIZE_BUCKETS: Tuple[float, ...] = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Route label of requests that didn't match any route, keeps the label set bounded
+UNMATCHED = "<unmatched>"
+
+
+class Histogram:
+    """
+    Cumulative histogram in the prometheus sense, buckets are upper bounds
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterable[str]:
+        """
+        Renders the `_bucket`, `_sum` and `_count` samples of this histogram
+        """
+        prefix = f"{labels}," if labels else ""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {total}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+def escape(value: str) -> str:
+    """
+    Escapes a prometheus label value
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    In-process metric registry rendered in the prometheus text format.
+
+    Other parts of the app can add their own samples by appending a collector, a callable
+    returning the lines to add to the output.
+
+    Usage
+    -----
+    ```python
+    app.metrics.collectors.append(lambda: ["# TYPE cache_hits counter", f"cache_hits {cache.hits}"])
+    ```
+    """
+
+    def __init__(self) -> None:
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.sizes: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight: int = 0
+        self.collectors: List[Callable[[], Iterable[str]]] = []
+
+    def observe(self, method: str, route: str, status: int, duration: float, size: int) -> None:
+        """
+        Records a finished request
+        """
+        key = (method, route, str(status))
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(duration)
+
+        size_key = (method, route)
+        histogram = self.sizes.get(size_key)
+        if histogram is None:
+            histogram = self.sizes[size_key] = Histogram(SIZE_BUCKETS)
+        histogram.observe(size)
+
+    def render(self) -> str:
+        """
+        Renders every metric in the prometheus text exposition format
+        """
+        lines: List[str] = [
+            "# HELP http_request_duration_seconds Request latency by route template",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in list(self.latency.items()):
+            labels = f'method="{escape(method)}",route="{escape(route)}",status="{status}"'
+            lines.extend(histogram.render("http_request_duration_seconds", labels))
+
+        lines.append("# HELP http_response_size_bytes Response body size by route template")
+        lines.append("# TYPE http_response_size_bytes histogram")
+        for (method, route), histogram in list(self.sizes.items()):
+            labels = f'method="{escape(method)}",route="{escape(route)}"'
+            lines.extend(histogram.render("http_response_size_bytes", labels))
+
+        lines.append("# HELP http_requests_in_flight Requests currently being handled")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+
+        for collector in self.collectors:
+            lines.extend(collector())
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every http request into a :class:`Metrics` registry.
+
+    Requests are labelled with the template of the route that handled them (`/items/{item_id}`),
+    which the router stores in the scope, never with the raw path.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.in_flight -= 1
+
+            metrics.observe(scope["method"], self.template(scope), status, duration, size)
+
+    @staticmethod
+    def template(scope: Scope) -> str:
+        """
+        Path template of the route that handled a request, `<unmatched>` if none did
+
+        FastAPI routes store themselves in the scope. Plain Starlette routes (`/openapi.json`,
+        `/docs`, `add_route`, mounts) don't, so they're matched again against the app's routes.
+        """
+        route: Any = scope.get("route")
+        if route is None:
+            partial = None
+            router = getattr(scope.get("app"), "router", None)
+            for candidate in getattr(router, "routes", ()):
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate
+                    break
+                if match == Match.PARTIAL and partial is None:
+                    partial = candidate
+            else:
+                # Path matched with another method, answered 405
+                route = partial
+
+        return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED
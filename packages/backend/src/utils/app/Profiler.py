@@ -0,0 +1,191 @@
+# === Core ===
+import os
+import sys
+import time
+import uuid
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from pathlib import Path
+from collections import Counter
+from urllib.parse import parse_qs
+
+# === Typing ===
+from typing import Dict, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class Sampler:
+    """
+    Stdlib-only sampling profiler.
+
+    Snapshots the stack of every thread of the process through `sys._current_frames()` at a
+    fixed interval and aggregates them as collapsed stacks (`root;caller;callee count`), the
+    input format of flamegraph.pl, speedscope and most other flame graph tools.
+
+    Usage
+    -----
+    ```python
+    sampler = Sampler(interval=0.005)
+    collapsed = sampler.run(seconds=10)
+    ```
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        :param float interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples: int = 0
+
+    @staticmethod
+    def frame_name(code) -> str:
+        """
+        Name of a frame in the collapsed output, `file:function`
+        """
+        return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+    def sample(self) -> None:
+        """
+        Takes one sample of every thread except the calling one
+        """
+        current = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self.frame_name(frame.f_code))
+                frame = frame.f_back
+
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> str:
+        """
+        Samples for a window of `seconds`, blocking the calling thread
+
+        :returns str: Collapsed stacks, one per line
+        """
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware profiling single requests on demand.
+
+    A request carrying the `X-Profile` header or a `profile` query parameter is run under
+    `cProfile`, the stats are written to `directory/<id>.prof` and the id is returned in the
+    `X-Profile-Id` response header. Only one request is profiled at a time, others are served
+    normally while it runs.
+
+    cProfile only follows the event loop thread, the body of sync (`def`) endpoints runs in the
+    threadpool and is better looked at through the :class:`Sampler` window. It also records
+    everything else the loop runs meanwhile: other requests served concurrently by the worker
+    show up in the profile, which is only clean on an otherwise idle worker.
+
+    Only the `retention` most recent profiles are kept in `directory`.
+    """
+
+    def __init__(self, app: ASGIApp, directory: Path, token: Optional[str] = None, retention: Optional[int] = 100) -> None:
+        """
+        :param Path directory: Where profiles are stored
+        :param Optional[str] token: Required in the `X-Profile-Token` header when set
+        :param Optional[int] retention: Maximum amount of stored profiles, None keeps everything
+        """
+        self.app = app
+        self.directory = directory
+        self.token = token
+        self.retention = retention
+        self.__busy = False
+
+    def wants_profile(self, scope: Scope) -> bool:
+        """
+        Whether a request asked to be profiled, and is allowed to
+        """
+        headers: Dict[bytes, bytes] = dict(scope.get("headers") or [])
+
+        requested = b"x-profile" in headers or "profile" in parse_qs(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        if not requested:
+            return False
+
+        if self.token and headers.get(b"x-profile-token", b"").decode("latin-1") != self.token:
+            return False
+
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.__busy or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        self.__busy = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self.__busy = False
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(self.directory / f"{profile_id}.prof")
+            self.trim()
+
+    def trim(self) -> None:
+        """
+        Deletes the oldest profiles past `retention`
+        """
+        if self.retention is None:
+            return
+
+        # Other workers trim the same directory, profiles can vanish between the glob and the stat
+        profiles = []
+        for path in self.directory.glob("*.prof"):
+            try:
+                profiles.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+
+        profiles.sort()
+        for _, path in profiles[:max(0, len(profiles) - self.retention)]:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def report(directory: Path, profile_id: str, limit: int = 50) -> Optional[str]:
+        """
+        Text report of a stored profile, sorted by cumulative time
+
+        :param Path directory: Where profiles are stored
+        :param str profile_id: Id returned in the `X-Profile-Id` header
+        :param int limit: Amount of functions listed
+        :returns Optional[str]: The report, None if there is no such profile
+        """
+        if not profile_id.isalnum():
+            return None
+
+        path = directory / f"{profile_id}.prof"
+        if not path.exists():
+            return None
+
+        out = StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(limit)
+        return f"pid {os.getpid()}\n{out.getvalue()}"
@@ -0,0 +1,181 @@
+# === Core ===
+import os
+import json
+from pathlib import Path
+
+# === Utils ===
+from utils.console import console
+
+# === Typing ===
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Bumped whenever the manifest layout changes
+_MANIFEST_VERSION = 1
+
+
+def route_prefix(paths: Iterable[str]) -> str:
+    """
+    Longest path prefix shared by every route, cut at the first path parameter
+
+    `["/api/admin/users", "/api/admin/{id}"]` gives `/api/admin`, no shared segment gives `""`.
+    """
+    split = [path.strip("/").split("/") for path in paths]
+    if not split:
+        return ""
+
+    prefix: List[str] = []
+    for parts in zip(*split):
+        if len(set(parts)) != 1 or "{" in parts[0] or not parts[0]:
+            break
+        prefix.append(parts[0])
+    return "/" + "/".join(prefix) if prefix else ""
+
+
+class RouteManifest:
+    """
+    On-disk cache of router discovery under `api/`.
+
+    Records every router module with the stamp (mtime, size) of its file, the stamps of the
+    directories walked, and the routes the module registered. While no stamp changed, a
+    boot reads the manifest instead of walking `api/` and resolving specs, and knows the
+    path prefix of each module without importing it, which is what deferred loading needs.
+
+    Adding, removing or renaming a file changes the mtime of its directory, so stat-ing the
+    recorded directories and files is enough to tell whether the manifest is still valid.
+    """
+
+    def __init__(self, root: Path, path: Optional[Path], api: str = "api") -> None:
+        """
+        :param Path root: Directory module names are relative to, the one holding `api/`
+        :param Optional[Path] path: Manifest file, None disables the manifest
+        :param str api: Directory routers are discovered in
+        """
+        self.root = root
+        self.path = path
+        self.api = api
+
+        self.dirs: Dict[str, int] = {}
+        self.modules: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def stamp(path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def scan(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Walks `api/` for router modules, skipping files and directories starting with `_`
+
+        :returns Dict[str, Dict[str, Any]]: Entry of every module, by module name
+        """
+        self.dirs = {}
+        self.modules = {}
+
+        api_route = self.root / self.api
+        if not api_route.is_dir():
+            return self.modules
+
+        for directory, dirnames, filenames in os.walk(api_route):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("_"))
+            directory = Path(directory)
+            self.dirs[directory.relative_to(self.root).as_posix()] = directory.stat().st_mtime_ns
+
+            for filename in sorted(filenames):
+                if not filename.endswith(".py") or filename.startswith("_"):
+                    continue
+
+                file = directory / filename
+                relative = file.relative_to(self.root)
+                module = ".".join(relative.with_suffix("").parts)
+                self.modules[module] = {"file": relative.as_posix(), "stamp": list(self.stamp(file))}
+
+        return self.modules
+
+    def load(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Reads the manifest if every recorded stamp still matches
+
+        :returns Optional[Dict[str, Dict[str, Any]]]: Module entries, None if there's no valid manifest
+        """
+        if self.path is None:
+            return None
+
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != _MANIFEST_VERSION or data.get("api") != self.api:
+            return None
+
+        try:
+            for directory, mtime in data["dirs"].items():
+                if (self.root / directory).stat().st_mtime_ns != mtime:
+                    return None
+            for entry in data["modules"].values():
+                if list(self.stamp(self.root / entry["file"])) != entry["stamp"]:
+                    return None
+        except (OSError, KeyError):
+            return None
+
+        self.dirs = data["dirs"]
+        self.modules = data["modules"]
+        return self.modules
+
+    def save(self) -> None:
+        """
+        Writes the manifest atomically, a read-only tree just keeps booting without one
+        """
+        if self.path is None:
+            return
+
+        data = {"version": _MANIFEST_VERSION, "api": self.api, "dirs": self.dirs, "modules": self.modules}
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            temporary.write_text(json.dumps(data, indent=1))
+            os.replace(temporary, self.path)
+        except OSError as error:
+            console.warn(f"Routers: manifest {self.path} not written, {error}")
+
+    def record(self, module: str, routes: Iterable[Tuple[str, List[str]]]) -> None:
+        """
+        Records the routes a module registered, and the path prefix they share
+        """
+        routes = [[path, sorted(methods)] for path, methods in routes]
+        entry = self.modules[module]
+        entry["routes"] = routes
+        entry["prefix"] = route_prefix(path for path, _ in routes)
+
+
+class DeferredRouterMiddleware:
+    """
+    Pure ASGI middleware importing deferred router modules on the first request under their prefix.
+
+    Until then the module isn't imported at all, its routes are missing from the OpenAPI
+    schema and from the route table. Loading happens inline on the event loop, once.
+    """
+
+    def __init__(self, app: ASGIApp, pending: Dict[str, List[str]], load: Callable[[str], Any]) -> None:
+        """
+        :param Dict[str, List[str]] pending: Deferred module names by path prefix
+        :param Callable[[str], Any] load: Imports and registers a router module by name
+        """
+        self.app = app
+        self.pending = pending
+        self.load = load
+
+    def __match(self, path: str) -> Optional[str]:
+        for prefix in self.pending:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.pending and scope["type"] in ("http", "websocket"):
+            prefix = self.__match(scope["path"])
+            if prefix is not None:
+                for module in self.pending.pop(prefix):
+                    self.load(module)
+
+        await self.app(scope, receive, send)
@@ -1,11 +1,18 @@
 import sys
+import json
 import inspect
-from typing import Any, Callable, List
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from functools import wraps
 
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from rich.console import Console as RichConsole
+from rich.markup import render as render_markup
+from rich.errors import MarkupError
+
+from utils.helper.config import Yaml
+from .Sink import AsyncSink, RotatingFile
 
 class Stream:
     def __init__(self, *streams):
@@ -23,17 +30,123 @@ class Stream:
 
 rich_log = RichConsole().log
 
+# Log levels, lowest first
+LEVELS: Dict[str, int] = {"debug": 10, "log": 15, "info": 20, "warn": 30, "error": 40}
+
+# Other spellings of the levels, as found in logging and uvicorn configs
+LEVEL_ALIASES: Dict[str, str] = {"trace": "debug", "notice": "info", "warning": "warn", "critical": "error", "fatal": "error"}
+
+
+def level_name(level: str) -> str:
+    """
+    Canonical name of a level, case insensitive and aliases resolved, `"WARNING"` gives `"warn"`
+
+    :raises ValueError: If it isn't a known level
+    """
+    name = str(level).strip().lower()
+    name = LEVEL_ALIASES.get(name, name)
+    if name not in LEVELS:
+        raise ValueError(f"Unknown log level {level}, expected one of {', '.join(LEVELS)}")
+    return name
+
+# Whether a code object belongs to this file, and callers keyed on (code object, line)
+_internal: Dict[CodeType, bool] = {}
+_callers: Dict[Tuple[CodeType, int], str] = {}
+
+
+def _find_caller() -> str:
+    """
+    Walks the stack to the first frame outside of this file, returning it as `parent/file:line`
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+
+        is_internal = _internal.get(code)
+        if is_internal is None:
+            is_internal = _internal[code] = "Console.py" in code.co_filename
+
+        if not is_internal:
+            key = (code, frame.f_lineno)
+            caller = _callers.get(key)
+            if caller is None:
+                path = Path(code.co_filename)
+                caller = _callers[key] = f"{path.parent.name}/{path.stem}:{frame.f_lineno}"
+            return caller
+
+        frame = frame.f_back
+    return "unknown:0"
+
+
+def _plain(argument: Any) -> str:
+    """
+    Text of a log argument without rich markup
+    """
+    if not isinstance(argument, str):
+        return str(argument)
+    if "[" not in argument:
+        return argument
+    try:
+        return render_markup(argument).plain
+    except MarkupError:
+        return argument
+
+
+def _resolve(args: Tuple[Any, ...]) -> List[Tuple[Any, bool, bool]]:
+    """
+    Inspects prepended or appended arguments once, returning (argument, is callable, takes arguments)
+    for each of them.
+    """
+    resolved: List[Tuple[Any, bool, bool]] = []
+    for argument in args:
+        if isinstance(argument, Callable):
+            resolved.append((argument, True, len(inspect.signature(argument).parameters) != 0))
+            continue
+        resolved.append((argument, False, False))
+    return resolved
+
 
 class Console:
     """
     Console object, used to log server events, debug statements, and error handling all in one.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        asynchronous: bool = True,
+        rotation: Optional[Dict[str, Any]] = None,
+        level: str = "debug",
+        structured: bool = False,
+        interactive: bool = True,
+        **sink_options,
+    ) -> None:
+        """
+        :param bool asynchronous: Write from a background thread through :class:`AsyncSink`
+        :param Optional[Dict[str, Any]] rotation: Options passed to :class:`RotatingFile`
+        :param str level: Minimum level logged, one of :data:`LEVELS` or :data:`LEVEL_ALIASES`. Anything below is dropped before formatting
+        :param bool structured: Write newline delimited JSON records to server.log instead of rich output
+        :param bool interactive: Render through rich to stdout, only optional in structured mode
+        :param sink_options: Options passed to :class:`AsyncSink`
+        """
+        self.level: int = LEVELS[level_name(level)]
+        self.structured = structured
+        self.interactive = interactive or not structured
+
         # Path object of the server.log file
         file: Path = Path("/logs") / "./server.log"
 
-        self.stream = Stream(sys.stdout, file.open(mode="a+"))
+        # Rotates itself, see RotatingFile
+        self.file = RotatingFile(file, **(rotation or {}))
+
+        # Rich output goes to stdout, and to server.log unless it receives JSON records
+        streams = (sys.stdout,) if structured else (sys.stdout, self.file)
+
+        if asynchronous:
+            self.stream = AsyncSink(*streams, **sink_options)
+            self.records = AsyncSink(self.file, **sink_options) if structured else None
+        else:
+            self.stream = Stream(*streams)
+            self.records = Stream(self.file) if structured else None
 
         # Private console object
         self.__console = RichConsole(width=120, file=self.stream, force_terminal=True, log_path=False)
@@ -62,6 +175,9 @@ class Console:
         ```
         """
 
+        # Resolve which callables take arguments once, not on every call
+        resolved = _resolve(args)
+
         def decorator(f: Callable):
 
             def wrapper(self, *f_args, **f_kwargs):
@@ -70,25 +186,18 @@ class Console:
                 buffer: List[Any] = []
 
                 # Iterate and possibly unpackage arguments
-                for argument in args:
+                for argument, is_callable, takes_arguments in resolved:
 
                     # Is callable, should get returned value
-                    if isinstance(argument, Callable):
-                        _signature = inspect.signature(argument)
-
-                        if len(_signature.parameters) == 0:
-                            buffer.append(argument())
-                            continue
-
-                        buffer.append(argument(*args, **kwargs))
+                    if is_callable:
+                        buffer.append(argument(*args, **kwargs) if takes_arguments else argument())
                         continue
 
                     # No special conditions passed
                     buffer.append(argument)
 
                 # Repackage function arguments
-                f_args = buffer + list(f_args)
-                return f(self, *f_args, **f_kwargs)
+                return f(self, *buffer, *f_args, **f_kwargs)
             return wrapper
         return decorator
 
@@ -115,6 +224,9 @@ class Console:
         :param kwargs: Optional keyword arguments passed to callables (if needed)
         :return: A decorated function with modified argument list
         """
+        # Resolve which callables take arguments once, not on every call
+        resolved = _resolve(args)
+
         def decorator(f: Callable):
             def wrapper(self, *f_args, **f_kwargs):
 
@@ -122,76 +234,30 @@ class Console:
                 buffer: List[Any] = []
 
                 # Iterate and possibly unpackage arguments
-                for argument in args:
+                for argument, is_callable, takes_arguments in resolved:
 
                     # Is callable, should get a returned value
-                    if isinstance(argument, Callable):
-                        _signature = inspect.signature(argument)
-
-                        if len(_signature.parameters) == 0:
-                            buffer.append(argument())
-                            continue
-
-                        buffer.append(argument(*args, **kwargs))
+                    if is_callable:
+                        buffer.append(argument(*args, **kwargs) if takes_arguments else argument())
                         continue
 
                     # No special conditions passed
                     buffer.append(argument)
 
                 # Repackage function arguments
-                f_args = list(f_args) + buffer
-                return f(self, *f_args, **f_kwargs)
+                return f(self, *f_args, *buffer, **f_kwargs)
             return wrapper
         return decorator
 
-    @staticmethod
-    def __create_file(path: Path) -> None:
-        """
-        Just creates an empty File, nothing too advanced happening here.
-        :arg path: :class:`pathlib.Path`: Path Object
-        """
-        with path.open(mode="w") as _:
-            return
-
-    @classmethod
-    def __rotate_if_too_large(cls, max_bytes: int = 2.56 * 1024**2):
-        """
-        Rotates the server log file if the server.log becomes too big.
-
-        :param int max_bytes: Size in bytes of the server.log file before its flushed
-        """
-
-        _time_extra: str = datetime.now().strftime("%m-%d-%Y--%H-%M-%S")
-
-        _serverlog: Path = Path("/logs") / 'server.log'
-        _logdir: Path = Path("/logs") / '.log/'
-
-        if not _logdir.exists():
-            _logdir.mkdir(exist_ok=True)
-
-        if not _serverlog.exists():
-            cls.__create_file(_serverlog)
-
-        if _serverlog.stat().st_size >= max_bytes:
-            _flush_path: Path = _logdir / _time_extra
-
-            # Ensure flush file exists
-            if not _flush_path.exists():
-                cls.__create_file(_flush_path)
-
-            _flush_path.write_text(_serverlog.read_text(), newline="\n")
-            _serverlog.write_text("")  # Flush
-
     @staticmethod
     def __print(_: Callable):
         """
-        Simply prints out *args through the rich text handler and rotates log files if needed.
+        Simply prints out *args through the rich text handler, the log file rotates itself.
         """
 
         @wraps(rich_log)
         def decorator(self, *args, **kwargs):
             self.__console.log(*args, **kwargs)
-            self.__rotate_if_too_large()
 
         return decorator
 
@@ -205,40 +271,86 @@ class Console:
     @staticmethod
     def __get_caller():
 
+        # Formatted tags keyed on caller
+        tags: Dict[str, str] = {}
+
         def get_file_and_line():
-            for frame in inspect.stack():
-                if "Console.py" not in frame.filename:
-                    parent: str = Path(frame.filename).parent.name
-                    filename = Path(frame.filename).stem
-                    lineno = frame.lineno
-                    return f"[dim]{parent}/{filename}:{lineno}[/dim]"
-            return "[dim]unknown:0[/dim]"
-        
-        def with_padding():
-            return f"{get_file_and_line():<30}"
-
-        return lambda: f"{with_padding()}"
+            caller = _find_caller()
+            tag = tags.get(caller)
+            if tag is None:
+                tag = tags[caller] = f"{f'[dim]{caller}[/dim]':<30}"
+            return tag
+
+        return get_file_and_line
+
+    @staticmethod
+    def __level(name: str):
+        """
+        Drops calls below the console's level before anything is formatted, writes the JSON record
+        in structured mode and only then renders through rich if the console is interactive.
+
+        Extra record fields can be passed as `extra`, they're ignored outside of structured mode and
+        never replace the built-in ones (`ts`, `level`, `caller`, `message`).
+        """
+        value = LEVELS[name]
+
+        def decorator(f: Callable):
+
+            @wraps(f)
+            def wrapper(self, *args, **kwargs):
+                if value < self.level:
+                    return
+
+                extra = kwargs.pop("extra", None)
+
+                if self.records is not None:
+                    self.__record(name, args, extra)
+
+                if self.interactive:
+                    f(self, *args, **kwargs)
+            return wrapper
+        return decorator
 
+    def __record(self, level: str, args: Tuple[Any, ...], extra: Optional[Dict[str, Any]]) -> None:
+        """
+        Writes a newline delimited JSON record to the structured sink
+        """
+        record: Dict[str, Any] = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "level": level,
+            "caller": _find_caller(),
+            "message": " ".join(_plain(argument) for argument in args),
+        }
+        for key, value in (extra or {}).items():
+            record.setdefault(key, value)
+
+        self.records.write(json.dumps(record, default=str) + "\n")
+
+    @__level("debug")
     @__prepend(__make_tag("DBG", "spring_green1"), __get_caller())
     @__print
     def debug(self, *_) -> None:
         pass
 
+    @__level("log")
     @__prepend(__make_tag("LOG", "deep_sky_blue2"), __get_caller())
     @__print
     def log(self, *_) -> None:
         pass
 
+    @__level("info")
     @__prepend(__make_tag("IFO", "purple3"), __get_caller())
     @__print
     def info(self, *_) -> None:
         pass
 
+    @__level("warn")
     @__prepend(__make_tag("WRN", "dark_orange3"), __get_caller())
     @__print
     def warn(self, *_) -> None:
         pass
 
+    @__level("error")
     @__prepend(__make_tag("ERR", "red3"), __get_caller())
     @__print
     def error(self, *_, **__) -> None:
@@ -251,4 +363,91 @@ class Console:
         return self.__console.print(*args, **kwargs)
 
 
-console = Console()
+# Supported keys of the `backend.console` section and of its `rotation` subsection, with their types
+_OPTIONS: Dict[str, Tuple[type, ...]] = {
+    "asynchronous": (bool,),
+    "structured": (bool,),
+    "interactive": (bool,),
+    "level": (str,),
+    "queue_size": (int,),
+    "policy": (str,),
+    "block_timeout": (int, float, type(None)),
+    "batch_bytes": (int,),
+    "flush_interval": (int, float),
+}
+_ROTATION: Dict[str, Tuple[type, ...]] = {
+    "max_bytes": (int,),
+    "archive_dir": (str,),
+    "compress": (bool,),
+    "retention": (int, type(None)),
+}
+
+
+def _warn(message: str) -> None:
+    # The console isn't there yet, and a logging config must never keep the app from importing
+    print(f"[console] {message}", file=sys.stderr)
+
+
+def _valid(section: Dict[str, Any], supported: Dict[str, Tuple[type, ...]], prefix: str) -> Dict[str, Any]:
+    """
+    Keys of a config section that are supported and of the right type, the others are reported and dropped
+    """
+    options: Dict[str, Any] = {}
+    for key, value in section.items():
+        types = supported.get(key)
+        if types is None:
+            _warn(f"ignoring unknown option {prefix}.{key}")
+            continue
+
+        # bool is an int, `queue_size: true` isn't a size
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            _warn(f"ignoring {prefix}.{key}: {value!r}, expected {' or '.join(t.__name__ for t in types)}")
+            continue
+
+        options[key] = value
+    return options
+
+
+def _options() -> dict:
+    """
+    Reads the `backend.console` config section, if there is a config to read
+
+    Unknown keys and bad values are reported on stderr and left to their defaults, importing the
+    console must never fail because of its config.
+    """
+    try:
+        section = Yaml().get("backend.console", default={}) or {}
+    except FileNotFoundError:
+        return {}
+
+    if not isinstance(section, dict):
+        _warn(f"ignoring backend.console: expected a mapping, got {type(section).__name__}")
+        return {}
+
+    options = _valid({key: value for key, value in section.items() if key != "rotation"}, _OPTIONS, "backend.console")
+
+    if "level" in options:
+        try:
+            options["level"] = level_name(options["level"])
+        except ValueError as error:
+            _warn(f"ignoring backend.console.level: {error}")
+            del options["level"]
+
+    if options.get("policy", "drop") not in ("drop", "block"):
+        _warn(f"ignoring backend.console.policy: {options.pop('policy')!r}, expected drop or block")
+
+    for key in ("queue_size", "batch_bytes", "flush_interval"):
+        if key in options and options[key] <= 0:
+            _warn(f"ignoring backend.console.{key}: {options.pop(key)!r}, expected a positive number")
+
+    rotation = section.get("rotation")
+    if rotation is not None:
+        if isinstance(rotation, dict):
+            options["rotation"] = _valid(rotation, _ROTATION, "backend.console.rotation")
+        else:
+            _warn(f"ignoring backend.console.rotation: expected a mapping, got {type(rotation).__name__}")
+
+    return options
+
+
+console = Console(**_options())
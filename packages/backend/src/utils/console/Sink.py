@@ -0,0 +1,367 @@
+import os
+import gzip
+import fcntl
+import time
+import queue
+import atexit
+import shutil
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, List, Literal, Optional, Tuple, Union
+
+# Marks the end of the queue
+_CLOSE = object()
+
+
+class AsyncSink:
+    """
+    File-like object that hands writes over to a background thread.
+
+    Writes are queued and returned immediately, the writer thread batches them and writes
+    the batch to every underlying stream once `batch_bytes` are buffered or the oldest
+    buffered record is `flush_interval` seconds old. The queue is bounded, once full
+    `policy` decides whether writers wait (`block`) or the record is counted and dropped (`drop`).
+
+    Usage
+    -----
+
+    ```python
+    sink = AsyncSink(sys.stdout, open("server.log", "a"))
+    sink.write("hello\n")
+    sink.close()  # Drains everything still queued
+    ```
+    """
+
+    def __init__(
+        self,
+        *streams,
+        queue_size: int = 10000,
+        policy: Literal["drop", "block"] = "drop",
+        block_timeout: Optional[float] = None,
+        batch_bytes: int = 64 * 1024,
+        flush_interval: float = 0.5,
+    ) -> None:
+        """
+        :param streams: Streams every batch is written to
+        :param int queue_size: Maximum amount of queued records
+        :param str policy: `drop` or `block`, behavior of writes when the queue is full
+        :param Optional[float] block_timeout: With `block`, drop the record after waiting this many seconds
+        :param int batch_bytes: Buffered size that triggers a write
+        :param float flush_interval: Maximum age in seconds of a buffered record before it's written
+        """
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown sink policy {policy}, expected drop or block")
+
+        self.streams = streams
+        self.queue_size = queue_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+
+        # Amount of records dropped because the queue was full
+        self.dropped: int = 0
+
+        self.closed: bool = False
+        self.__start()
+
+        atexit.register(self.close)
+        os.register_at_fork(after_in_child=self.__start)
+
+    def __start(self) -> None:
+        """
+        Creates the queue and writer thread, also used to revive the sink in forked children
+        """
+        self.__queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self.__thread = threading.Thread(target=self.__run, name="console-sink", daemon=True)
+        self.__thread.start()
+
+    def write(self, data: str) -> int:
+        """
+        Queues data to be written, never blocks under the `drop` policy
+        """
+        if self.closed:
+            self.__write([data])
+            return len(data)
+
+        try:
+            if self.policy == "drop":
+                self.__queue.put_nowait(data)
+            else:
+                self.__queue.put(data, timeout=self.block_timeout)
+        except queue.Full:
+            self.dropped += 1
+
+        return len(data)
+
+    def flush(self) -> None:
+        """
+        No-op, flushing is handled by the writer thread. See :meth:`drain`
+        """
+        return
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """
+        Blocks until every record queued so far has been written
+
+        :param Optional[float] timeout: Maximum seconds to wait
+        """
+        if self.closed:
+            return
+
+        done = threading.Event()
+        self.__queue.put(done, timeout=timeout)
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Drains the queue and stops the writer thread
+        """
+        if self.closed:
+            return
+
+        self.__queue.put(_CLOSE)
+        self.__thread.join()
+        self.closed = True
+
+    def __write(self, buffer: List[str]) -> None:
+        """
+        Writes a batch to every stream
+        """
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            buffer.append(f"[console] dropped {dropped} log records, the sink queue was full\n")
+
+        data = "".join(buffer)
+        for stream in self.streams:
+            try:
+                stream.write(data)
+                stream.flush()
+            except (OSError, ValueError):
+                # A broken stream shouldn't take the others down
+                continue
+
+    def __run(self) -> None:
+        """
+        Writer thread loop
+        """
+        buffer: List[str] = []
+        size: int = 0
+        deadline: float = 0.0
+
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if buffer else None
+
+            try:
+                item: Any = self.__queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            # Time threshold reached, or a marker asking for everything to be written
+            if item is None or item is _CLOSE or isinstance(item, threading.Event):
+                if buffer:
+                    self.__write(buffer)
+                    buffer, size = [], 0
+
+                if item is _CLOSE:
+                    return
+                if item is not None:
+                    item.set()
+                continue
+
+            if not buffer:
+                deadline = time.monotonic() + self.flush_interval
+
+            buffer.append(item)
+            size += len(item)
+
+            if size >= self.batch_bytes:
+                self.__write(buffer)
+                buffer, size = [], 0
+
+
+class RotatingFile:
+    """
+    Append-only log file that rotates itself once it grows past `max_bytes`.
+
+    The size is tracked in-process from the bytes written, so writes never `stat()` the file,
+    flushes do once per batch to notice a rotation made by another process. Rotation renames
+    the file into `archive_dir` and reopens a fresh one, rotated segments are then optionally
+    gzipped and the archive trimmed to `retention` segments on a background thread.
+
+    Several processes (uvicorn workers) can share the file:
+
+    - Rotations are serialized through an `flock` on `<file>.lock`, and a process whose counter
+      trips only renames the file if it's still the one it has open, otherwise another process
+      already rotated and it just reopens.
+    - Every process holds a shared `flock` on the segment it writes to, a segment is only
+      compressed once it can be locked exclusively, that is once every writer moved on.
+      Segments still held are left for a later pass.
+    """
+
+    # Seconds the archiver waits for the writers of a rotated segment to move on
+    release_timeout: float = 30.0
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = int(2.56 * 1024**2),
+        archive_dir: Optional[Union[str, Path]] = None,
+        compress: bool = False,
+        retention: Optional[int] = 50,
+    ) -> None:
+        """
+        :param Union[str, Path] path: Path of the log file
+        :param int max_bytes: Size in bytes the file is rotated at
+        :param Optional[Union[str, Path]] archive_dir: Where rotated segments go, defaults to `.log/` next to the file
+        :param bool compress: Gzip rotated segments
+        :param Optional[int] retention: Maximum amount of segments kept in the archive, None keeps everything
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.archive_dir = Path(archive_dir) if archive_dir else self.path.parent / ".log"
+        self.compress = compress
+        self.retention = retention
+        self.lock_path = self.path.with_name(f"{self.path.name}.lock")
+
+        self.__lock = threading.Lock()
+        self.__archive_lock = threading.Lock()
+        self.__open()
+
+    def __open(self) -> None:
+        self.file = self.path.open(mode="ab")
+        fcntl.flock(self.file.fileno(), fcntl.LOCK_SH)
+        self.size: int = self.file.seek(0, os.SEEK_END)
+        self.inode: int = os.fstat(self.file.fileno()).st_ino
+
+    def __reopen(self) -> None:
+        self.file.close()
+        self.__open()
+
+    def __current(self) -> bool:
+        """
+        Whether the open file is still the one at `path`
+        """
+        try:
+            return os.stat(self.path).st_ino == self.inode
+        except FileNotFoundError:
+            return False
+
+    def write(self, data: str) -> int:
+        """
+        Appends data to the file, rotating it if it grew too large
+        """
+        encoded = data.encode("utf-8")
+
+        with self.__lock:
+            self.file.write(encoded)
+            self.size += len(encoded)
+
+            if self.size >= self.max_bytes:
+                self.__rotate()
+
+        return len(data)
+
+    def flush(self) -> None:
+        with self.__lock:
+            self.file.flush()
+
+            # Rotated by another process, its segment is compressed once every writer let go of it
+            if not self.__current():
+                self.__reopen()
+
+    def close(self) -> None:
+        with self.__lock:
+            self.file.close()
+
+    def __rotate(self) -> None:
+        """
+        Moves the current file into the archive and reopens a fresh one, caller holds the lock
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.file.flush()
+
+        with self.lock_path.open("a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+
+            rotated = self.__current()
+            if rotated:
+                stamp = datetime.now().strftime("%m-%d-%Y--%H-%M-%S")
+                target = self.archive_dir / stamp
+                counter = 1
+                while target.exists() or target.with_name(f"{target.name}.gz").exists():
+                    target = self.archive_dir / f"{stamp}.{counter}"
+                    counter += 1
+                os.rename(self.path, target)
+
+            # Opened under the lock, so it's the file the rotation left in place
+            self.__reopen()
+
+        if rotated and (self.compress or self.retention is not None):
+            threading.Thread(target=self.__archive, name="console-archive", daemon=True).start()
+
+    @staticmethod
+    def stamp(segment: Path) -> Optional[Tuple[datetime, int]]:
+        """
+        Rotation time and counter of an archived segment from its name, None if it isn't one
+        """
+        name = segment.name.removesuffix(".gz")
+        stamp, _, counter = name.partition(".")
+        try:
+            return datetime.strptime(stamp, "%m-%d-%Y--%H-%M-%S"), int(counter or 0)
+        except ValueError:
+            return None
+
+    def __segments(self) -> List[Path]:
+        """
+        Archived segments, oldest rotation first
+        """
+        segments = [(stamp, item) for item in self.archive_dir.iterdir() if item.is_file() and (stamp := self.stamp(item)) is not None]
+        return [item for _, item in sorted(segments)]
+
+    def __compress(self, segment: Path) -> None:
+        """
+        Gzips a segment once no process writes to it anymore, left for a later pass otherwise
+        """
+        try:
+            source = segment.open("rb")
+        except FileNotFoundError:
+            return
+
+        with source:
+            deadline = time.monotonic() + self.release_timeout
+            while True:
+                try:
+                    fcntl.flock(source.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() > deadline:
+                        return
+                    time.sleep(0.5)
+
+            # Compressed meanwhile by the archiver of another process
+            if not segment.exists():
+                return
+
+            compressed = segment.with_name(f"{segment.name}.gz")
+            with gzip.open(compressed, "wb") as target:
+                shutil.copyfileobj(source, target)
+            segment.unlink()
+
+    def __archive(self) -> None:
+        """
+        Compresses rotated segments and trims the archive, runs on a background thread
+        """
+        with self.__archive_lock:
+            if self.compress:
+                for segment in self.__segments():
+                    if segment.suffix != ".gz":
+                        self.__compress(segment)
+
+            if self.retention is None:
+                return
+
+            segments = self.__segments()
+            for item in segments[:max(0, len(segments) - self.retention)]:
+                item.unlink(missing_ok=True)
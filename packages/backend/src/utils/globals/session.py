@@ -1 +1,55 @@
-session: list[str] = []
\ No newline at end of file
+# === Utils ===
+from utils.helper.config import Yaml
+from utils.helper.session import SessionStore
+from utils.console import console
+
+# === Typing ===
+from typing import Any, Dict, Tuple
+
+# Options of SessionStore, with their accepted types
+_OPTIONS: Dict[str, Tuple[type, ...]] = {
+    "lifetime": (int, float),
+    "cache_size": (int,),
+    "staleness": (int, float),
+    "negative_ttl": (int, float),
+}
+
+
+def _options() -> dict:
+    """
+    Store options from the `backend.sessions` config section, defaults if there is no config
+
+    Unknown keys and bad values are reported and left to their defaults, importing the session
+    store must never fail because of its config.
+    """
+    try:
+        section = Yaml().get("backend.sessions", default={}) or {}
+    except FileNotFoundError:
+        return {}
+
+    if not isinstance(section, dict):
+        console.warn(f"Sessions: ignoring backend.sessions, expected a mapping, got {type(section).__name__}")
+        return {}
+
+    options: Dict[str, Any] = {}
+    for key, value in section.items():
+        types = _OPTIONS.get(key)
+        if types is None:
+            console.warn(f"Sessions: ignoring unknown option backend.sessions.{key}")
+            continue
+
+        # bool is an int, `cache_size: true` isn't a size
+        if isinstance(value, bool) or not isinstance(value, types):
+            console.warn(f"Sessions: ignoring backend.sessions.{key}: {value!r}, expected {' or '.join(t.__name__ for t in types)}")
+            continue
+
+        # 0 turns the caches off, but a session must last
+        if value < 0 or (value == 0 and key == "lifetime"):
+            console.warn(f"Sessions: ignoring backend.sessions.{key}: {value!r}, expected a positive number")
+            continue
+
+        options[key] = value
+    return options
+
+
+session: SessionStore = SessionStore(**_options())
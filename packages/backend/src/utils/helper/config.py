@@ -3,16 +3,157 @@ This module has one simple purpose: Find and Parse given configuration files.
 In this file, imports are handled
 """
 
+import os
 import re
-import yaml
+import json
+import hashlib
+import threading
+import traceback
 
 from abc import ABC, abstractmethod
 from pathlib import Path
 
-from typing import Any, Callable, Dict, Optional, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 _SENTINEL = object()
 
+# Matches {dotted.key} placeholders
+_PLACEHOLDER = re.compile(r"\{([A-Za-z0-9_.]+)\}")
+
+
+# Directory compiled config snapshots are written to, disabled if unset
+COMPILED_DIR: Optional[str] = os.environ.get("CONFIG_COMPILED_DIR") or None
+
+# Bumped whenever the compiled snapshot layout changes
+_COMPILED_VERSION = 1
+
+
+class ConfigSnapshot(NamedTuple):
+    """
+    Parsed state of a config file at a given stamp
+
+    `index` maps every dotted path of the config (`backend`, `backend.uvicorn_config`,
+    `backend.uvicorn_config.port`, ...) to its value, with `""` mapping to the whole config.
+    """
+    stamp: Tuple[int, int, int]
+    config: dict
+    index: Dict[str, Any]
+
+
+def flatten(config: Any) -> Dict[str, Any]:
+    """
+    Builds the dotted path index of a parsed config
+
+    Keys that aren't strings or that contain a dot can't be addressed with dot notation
+    and are left out, along with everything below them.
+
+    :param Any config: Parsed configuration
+    :returns Dict[str, Any]: Mapping of every dotted path to its value
+    """
+    index: Dict[str, Any] = {"": config}
+
+    def walk(value: Any, prefix: str) -> None:
+        for key, child in value.items():
+            if not isinstance(key, str) or "." in key:
+                continue
+
+            path = f"{prefix}{key}"
+            index[path] = child
+
+            if isinstance(child, dict):
+                walk(child, f"{path}.")
+
+    if isinstance(config, dict):
+        walk(config, "")
+
+    return index
+
+
+@lru_cache(maxsize=1024)
+def split_key(key: str) -> Tuple[str, ...]:
+    """
+    Memoized split of a dot notation key
+    """
+    return tuple(key.split("."))
+
+
+class ConfigCache:
+    """
+    Process-wide cache of parsed configuration files
+
+    Entries are keyed on the resolved path of the file and stamped with the file's
+    inode, size and modification time. A lookup only costs a `stat()`; the file is
+    re-read, re-parsed and re-indexed only when that stamp changes or the entry is invalidated.
+
+    Values handed out by the cache are shared between callers and must not be mutated.
+    """
+
+    def __init__(self) -> None:
+        self.__entries: Dict[str, ConfigSnapshot] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def stamp(path: str) -> Tuple[int, int, int]:
+        """
+        Returns the (inode, size, mtime) stamp of a file
+
+        :param str path: Path of the file
+        :raises FileNotFoundError: If the file doesn't exist
+        """
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def snapshot(self, primitive: "Primitive") -> ConfigSnapshot:
+        """
+        Returns the current snapshot of a config file, parsing it only if needed
+
+        :param Primitive primitive: Loader responsible for the file
+        :returns ConfigSnapshot: Parsed configuration and its dotted path index
+        """
+        key = primitive.key
+        stamp = self.stamp(key)
+
+        entry = self.__entries.get(key)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+
+        with self.__lock:
+
+            # Another thread may have parsed it while we were waiting
+            entry = self.__entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                return entry
+
+            config = primitive.parse_compiled()
+            entry = ConfigSnapshot(stamp, config, flatten(config))
+            self.__entries[key] = entry
+            return entry
+
+    def load(self, primitive: "Primitive") -> dict:
+        """
+        Returns the parsed contents of a config file, parsing it only if needed
+
+        :param Primitive primitive: Loader responsible for the file
+        :returns dict: Parsed configuration
+        """
+        return self.snapshot(primitive).config
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drops cached entries, forcing the next lookup to re-parse
+
+        :param Optional[str] path: Resolved path to drop, drops every entry if not given
+        """
+        with self.__lock:
+            if path is None:
+                self.__entries.clear()
+                return
+            self.__entries.pop(path, None)
+
+
+config_cache = ConfigCache()
+
 
 class Primitive(ABC):
     """
@@ -24,7 +165,7 @@ class Primitive(ABC):
     > test
     """
 
-    def __init__(self, path: Optional[str] = None, lazy: bool = False, default: str = ""):
+    def __init__(self, path: Optional[str] = None, lazy: bool = False, default: str = "", compiled_dir: Optional[str] = COMPILED_DIR):
         """
         Before anything, makes sure that the config is fully loaded and ready to go.
         This includes root folders, os env specs etc.
@@ -39,6 +180,7 @@ class Primitive(ABC):
         :param str file: Name of the file that will be used        
         :param bool lazy: Whether or not to create the file if it doesn't exist
         :param str default: If lazy is specified, this is what is written to the file to create it
+        :param Optional[str] compiled_dir: Directory for compiled snapshots, see :meth:`parse_compiled`. Defaults to `$CONFIG_COMPILED_DIR`
         :raises FileNotFoundError: Whenever no `path` is supplied or the "discovered" file doesn't exist       
 
         """
@@ -62,6 +204,88 @@ class Primitive(ABC):
 
         self.file = _config_file
 
+        # Cache key, resolved once per loader
+        self.key: str = os.path.realpath(_config_file)
+
+        self.compiled_dir: Optional[Path] = Path(compiled_dir) if compiled_dir else None
+
+    def load(self) -> dict:
+        """
+        Returns the parsed config through the process-wide :class:`ConfigCache`,
+        only calling `parse()` when the file changed since it was last parsed.
+
+        :returns dict: Dict representation of configuration
+        """
+        return config_cache.load(self)
+
+    def index(self) -> Dict[str, Any]:
+        """
+        Returns the dotted path index of the cached config, see :func:`flatten`
+
+        :returns Dict[str, Any]: Mapping of every dotted path to its value
+        """
+        return config_cache.snapshot(self).index
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached parse of this file, the next `load()` re-parses it
+        """
+        config_cache.invalidate(self.key)
+
+    @property
+    def compiled_file(self) -> Optional[Path]:
+        """
+        Path of the compiled snapshot of this file, None if compiled snapshots are disabled
+        """
+        if self.compiled_dir is None:
+            return None
+        name = hashlib.sha1(self.key.encode("utf-8")).hexdigest()
+        return self.compiled_dir / f"{name}.json"
+
+    def parse_compiled(self) -> dict:
+        """
+        Parses the file through its compiled snapshot
+
+        The snapshot is a JSON sidecar stamped with the sha256 of the source file. When the
+        stamp matches, the JSON is loaded directly and `parse()` is skipped entirely. Otherwise
+        the file is parsed and the snapshot rewritten, as long as the parsed config survives a
+        JSON round trip unchanged (dates, sets or non-string keys keep it on the regular path).
+
+        Falls back to `parse()` if compiled snapshots are disabled.
+
+        :returns dict: Dict representation of configuration
+        """
+
+        compiled_file = self.compiled_file
+        if compiled_file is None or self.file is None:
+            return self.parse()
+
+        source = hashlib.sha256(self.file.read_bytes()).hexdigest()
+
+        try:
+            compiled = json.loads(compiled_file.read_text(encoding="utf-8"))
+            if compiled.get("version") == _COMPILED_VERSION and compiled.get("source") == source:
+                return compiled["config"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+
+        config = self.parse()
+
+        try:
+            dumped = json.dumps({"version": _COMPILED_VERSION, "source": source, "config": config})
+            if json.loads(dumped)["config"] != config:
+                return config
+
+            # Write next to the target and swap, so readers never see a partial file
+            compiled_file.parent.mkdir(parents=True, exist_ok=True)
+            partial = compiled_file.with_suffix(f".{os.getpid()}.tmp")
+            partial.write_text(dumped, encoding="utf-8")
+            os.replace(partial, compiled_file)
+        except (OSError, TypeError, ValueError):
+            pass
+
+        return config
+
     def read(self, lazy: bool = False, default: str = ""):
         """
         Reads the specified file given to the __init__ function
@@ -92,32 +316,41 @@ class Primitive(ABC):
         Takes a string, dict, list, or tuple and recursively populates all environment variables
         formatted like {$ENV_VAR}. Will raise KeyError if any are missing.
 
+        Placeholders are resolved against the dotted path index of the config, which is
+        fetched once for the whole input.
+
         :param _in: Input value to process
         :return: Populated version of the input
         :raises KeyError: If a referenced environment variable is not found
         """
-        pattern = re.compile(r"\{([A-Za-z0-9_.]+)\}")
+        index = self.index()
 
         def replacer(match):
             var_name = match.group(1)
+            if var_name in index:
+                return str(index[var_name])
+
+            # Let get raise the appropriate error
             return str(self.get(var_name))
 
-        if isinstance(_in, str):
-            return pattern.sub(replacer, _in)
+        def populate(value):
+            if isinstance(value, str):
+                if "{" not in value:
+                    return value
+                return _PLACEHOLDER.sub(replacer, value)
 
-        elif isinstance(_in, dict):
-            return {
-                self.populate_environment(k): self.populate_environment(v)
-                for k, v in _in.items()
-            }
+            elif isinstance(value, dict):
+                return {populate(k): populate(v) for k, v in value.items()}
 
-        elif isinstance(_in, list):
-            return [self.populate_environment(item) for item in _in]
+            elif isinstance(value, list):
+                return [populate(item) for item in value]
 
-        elif isinstance(_in, tuple):
-            return tuple(self.populate_environment(item) for item in _in)
+            elif isinstance(value, tuple):
+                return tuple(populate(item) for item in value)
 
-        return _in
+            return value
+
+        return populate(_in)
 
     @abstractmethod
     def parse(self, lazy: bool = False, default: Optional[Any] = _SENTINEL) -> dict:
@@ -178,14 +411,17 @@ class Primitive(ABC):
         if not isinstance(key, str):
             raise TypeError(f"Key is of an incorrect type, expected str, got {type(key)} instead")
 
-        # Get config from parse function
-        config: Dict[str, Any] = self.parse()
+        # Get the dotted path index from the parse cache
+        index: Dict[str, Any] = self.index()
+
+        if key in index:
+            return index[key]
 
-        if key == "":
-            return config
+        # Not indexed, walk the config to report where the key fails
+        config: Dict[str, Any] = index[""]
 
         # Split key on dots
-        keys = key.split(".")
+        keys = split_key(key)
 
         for i, _key in enumerate(keys):
 
@@ -212,12 +448,211 @@ class Primitive(ABC):
 class Yaml(Primitive):
     """Yaml Config Loader
 
-    Attempts to locate and parse a .yaml file
+    Attempts to locate and parse a .yaml file, using the libyaml `CSafeLoader` when available
     """
 
     def __init__(self, path: str = "/config/config.yml", *args, **kwargs):
         super().__init__(path, *args, **kwargs)
 
     def parse(self, lazy: bool = False, default: Optional[Any] = _SENTINEL) -> dict:
+        # Imported here so processes served by a compiled snapshot never pay for it
+        import yaml
+
         contents: str = self.read(lazy, "")
-        return yaml.load(contents, Loader=yaml.FullLoader)
+        return yaml.load(contents, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+class ConfigWatcher:
+    """
+    Watches a config file and pushes changes to subscribers
+
+    The file is watched through `watchdog` (inotify on linux) when it's installed, falling
+    back to polling its stat stamp. On change the file is re-parsed once through the
+    :class:`ConfigCache`, the current :class:`ConfigSnapshot` is swapped for the new one
+    and subscribers are told which dotted keys changed.
+
+    Readers can use :meth:`get` or `snapshot.index` directly, neither touches the disk.
+
+    Usage
+    -----
+    ```python
+    watcher = ConfigWatcher(Yaml())
+
+    @watcher.subscribe("backend.uvicorn_config.log_level")
+    def on_log_level(changed: set[str], snapshot: ConfigSnapshot):
+        print(snapshot.index["backend.uvicorn_config.log_level"])
+
+    watcher.start()
+    ```
+    """
+
+    def __init__(self, config: Optional[Primitive] = None, interval: float = 1.0, polling: bool = False) -> None:
+        """
+        :param Optional[Primitive] config: Loader of the watched file, defaults to :class:`Yaml`
+        :param float interval: Seconds between checks when polling
+        :param bool polling: Always poll, even if `watchdog` is installed. A file that is a mount
+            point itself (a single file bind mount) is always polled, edits made outside the
+            container don't raise events on the directory the observer watches
+        """
+        self.config: Primitive = config or Yaml()
+        self.interval = interval
+        self.polling = polling
+
+        # Current snapshot, only ever replaced as a whole
+        self.snapshot: ConfigSnapshot = config_cache.snapshot(self.config)
+
+        self.__subscribers: List[Tuple[Tuple[str, ...], Callable[[Set[str], ConfigSnapshot], Any]]] = []
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__observer: Any = None
+        self.__thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+        """
+        Returns the dotted keys whose value differs between two indexes,
+        including keys that were added or removed
+        """
+        changed = {key for key in old.keys() ^ new.keys() if key}
+        changed.update(key for key in old.keys() & new.keys() if key and old[key] != new[key])
+        return changed
+
+    def get(self, key: str = "", default: Optional[Any] = _SENTINEL) -> Any:
+        """
+        Gets a value from the current snapshot without touching the file
+
+        :param str key: Dot notation key
+        :param Optional[Any] default: Returned if the key doesn't exist, raises KeyError if not given
+        """
+        index = self.snapshot.index
+        if key in index:
+            return index[key]
+        if default is not _SENTINEL:
+            return default
+        raise KeyError(f"Key \"{key}\" not found within object.")
+
+    def subscribe(self, *keys: str) -> Callable:
+        """
+        Decorator registering a callback for config changes
+
+        The callback receives the set of changed dotted keys and the new snapshot. If keys
+        are given, it is only called when one of them, or anything below them, changed.
+
+        :param str keys: Dotted keys to filter on
+        """
+
+        def decorator(callback: Callable[[Set[str], ConfigSnapshot], Any]):
+            with self.__lock:
+                self.__subscribers.append((keys, callback))
+            return callback
+        return decorator
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """
+        Removes every registration of a callback
+        """
+        with self.__lock:
+            self.__subscribers = [item for item in self.__subscribers if item[1] is not callback]
+
+    def check(self) -> Set[str]:
+        """
+        Swaps in a new snapshot if the file changed and notifies subscribers
+
+        A file that fails to parse (e.g. half written) keeps the current snapshot.
+
+        :returns Set[str]: Dotted keys that changed
+        """
+        try:
+            snapshot = config_cache.snapshot(self.config)
+        except Exception:
+            return set()
+
+        with self.__lock:
+            if snapshot is self.snapshot or snapshot.stamp == self.snapshot.stamp:
+                return set()
+
+            previous, self.snapshot = self.snapshot, snapshot
+            subscribers = list(self.__subscribers)
+
+        changed = self.diff(previous.index, snapshot.index)
+        if not changed:
+            return changed
+
+        for keys, callback in subscribers:
+            if keys and not any(key == watched or key.startswith(f"{watched}.") for key in changed for watched in keys):
+                continue
+
+            # One faulty subscriber shouldn't starve the others
+            try:
+                callback(changed, snapshot)
+            except Exception:
+                traceback.print_exc()
+
+        return changed
+
+    def start(self) -> None:
+        """
+        Starts watching the file in the background
+        """
+        if self.__observer is not None or self.__thread is not None:
+            return
+
+        self.__stop.clear()
+
+        if not self.polling and not os.path.ismount(self.config.key) and self.__start_observer():
+            return
+
+        self.__thread = threading.Thread(target=self.__poll, name="config-watcher", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops watching the file
+        """
+        self.__stop.set()
+
+        if self.__observer is not None:
+            self.__observer.stop()
+            self.__observer.join()
+            self.__observer = None
+
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __start_observer(self) -> bool:
+        """
+        Starts a watchdog observer on the file's directory, returns False if watchdog isn't usable
+        """
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return False
+
+        watcher = self
+        target = self.config.key
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = (getattr(event, "src_path", None), getattr(event, "dest_path", None))
+                if any(path and os.path.realpath(path) == target for path in paths):
+                    watcher.check()
+
+        try:
+            observer = Observer()
+            observer.schedule(Handler(), os.path.dirname(target), recursive=False)
+            observer.daemon = True
+            observer.start()
+        except OSError:
+            return False
+
+        self.__observer = observer
+        return True
+
+    def __poll(self) -> None:
+        """
+        Polling loop, the cache's stat stamp does the change detection
+        """
+        while not self.__stop.wait(self.interval):
+            self.check()
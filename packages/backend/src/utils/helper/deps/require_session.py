@@ -2,22 +2,36 @@
 from utils.globals import session
 
 # === Typing ===
-from fastapi import Cookie, HTTPException, status
+from fastapi import Cookie, HTTPException, Request, status
 from typing import Annotated
 
 
-def require_session(session_token: Annotated[str | None, Cookie()] = None) -> str:
+async def require_session(request: Request, session_token: Annotated[str | None, Cookie()] = None) -> str:
     """
     When used as a dependency, the user must submit a valid session_token through the cookies header.
     If the session_token isn't valid, return 401, other wise, call the next decorated function
 
+    Runs on the event loop: cached tokens are answered inline, only cache misses await the
+    database. The outcome is kept on `request.state`, other dependencies of the same request
+    needing the session reuse it instead of looking the token up again.
+
+    :param Request request: Current request, holds the memoized outcome
     :param str | None session_token: session_token in cookie header
     """
 
     if session_token is None:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "No session_token given")
 
-    if session_token not in session:
+    checked: dict[str, bool] | None = getattr(request.state, "session_checked", None)
+    if checked is None:
+        checked = request.state.session_checked = {}
+
+    valid = checked.get(session_token)
+    if valid is None:
+        valid = checked[session_token] = await session.validate_async(session_token)
+
+    if not valid:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Session token is invalid")
 
+    request.state.session_token = session_token
     return session_token
@@ -0,0 +1,210 @@
+# === Core ===
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+# === Utils ===
+from utils.helper.time import now
+from utils.abc.handlers.session import AsyncSession, Session
+
+# === Typing ===
+from typing import Any, Optional
+
+
+class SessionStore:
+    """
+    Mongo backed session store, fronted by an in-process cache.
+
+    Valid tokens are cached for `staleness` seconds (never past their expiry), unknown or
+    expired ones for `negative_ttl` seconds, so most checks don't reach the database. A
+    session revoked from another worker is honored once the local entry is older than
+    `staleness`, revocations made through this store apply immediately.
+
+    Usage
+    -----
+    ```python
+    session = store.open()
+    session.id in store  # True
+    store.revoke(session.id)
+    ```
+    """
+
+    def __init__(
+        self,
+        lifetime: float = 7 * 24 * 3600,
+        cache_size: int = 10000,
+        staleness: float = 30.0,
+        negative_ttl: float = 5.0,
+    ) -> None:
+        """
+        :param float lifetime: Seconds a new session lasts
+        :param int cache_size: Maximum amount of cached valid tokens, and of cached invalid ones
+        :param float staleness: Seconds a valid token is trusted without checking the database
+        :param float negative_ttl: Seconds an invalid token is rejected without checking the database
+        """
+        self.lifetime = timedelta(seconds=lifetime)
+        self.cache_size = cache_size
+        self.staleness = staleness
+        self.negative_ttl = negative_ttl
+
+        self.lock = threading.Lock()
+        self.valid: OrderedDict[str, float] = OrderedDict()
+        self.invalid: OrderedDict[str, float] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        # Database lookups in flight on the event loop, concurrent misses on a token share one
+        self.pending: dict[str, asyncio.Future] = {}
+
+    def __contains__(self, token: Any) -> bool:
+        return isinstance(token, str) and self.validate(token)
+
+    # === Cache ===
+
+    def lookup(self, token: str) -> Optional[bool]:
+        """
+        Answer of the cache alone, None if the database has to be asked
+        """
+        clock = time.monotonic()
+        with self.lock:
+            until = self.valid.get(token)
+            if until is not None:
+                if until > clock:
+                    self.valid.move_to_end(token)
+                    self.hits += 1
+                    return True
+                del self.valid[token]
+
+            until = self.invalid.get(token)
+            if until is not None:
+                if until > clock:
+                    self.hits += 1
+                    return False
+                del self.invalid[token]
+
+            self.misses += 1
+            return None
+
+    def remember(self, token: str, expires: Optional[int]) -> bool:
+        """
+        Caches the database answer for a token
+
+        :param Optional[int] expires: POSIX expiry of the session, None if there is no such session
+        :returns bool: Whether the token is valid
+        """
+        clock = time.monotonic()
+        remaining = None if expires is None else expires - now()
+
+        with self.lock:
+            if remaining is None or remaining <= 0:
+                self.valid.pop(token, None)
+                self.invalid[token] = clock + self.negative_ttl
+                self.invalid.move_to_end(token)
+                while len(self.invalid) > self.cache_size:
+                    self.invalid.popitem(last=False)
+                return False
+
+            self.invalid.pop(token, None)
+            self.valid[token] = clock + min(self.staleness, remaining)
+            self.valid.move_to_end(token)
+            while len(self.valid) > self.cache_size:
+                self.valid.popitem(last=False)
+            return True
+
+    def forget(self, token: Optional[str] = None) -> None:
+        """
+        Drops a token from the cache, every token if None
+        """
+        with self.lock:
+            if token is None:
+                self.valid.clear()
+                self.invalid.clear()
+                return
+            self.valid.pop(token, None)
+            self.invalid.pop(token, None)
+
+    # === Sessions ===
+
+    @staticmethod
+    def query(token: str) -> dict[str, Any]:
+        """
+        Filter matching the unexpired session of a token
+        """
+        return {"id": token, "expires": {"$gt": now()}}
+
+    def validate(self, token: str) -> bool:
+        """
+        Whether a token belongs to an unexpired session, from the cache when possible
+        """
+        cached = self.lookup(token)
+        if cached is not None:
+            return cached
+
+        try:
+            document = Session.get_raw(projection=["expires"], **self.query(token))
+        except LookupError:
+            document = None
+
+        return self.remember(token, None if document is None else document["expires"])
+
+    async def validate_async(self, token: str) -> bool:
+        """
+        :meth:`validate` for the event loop, the cache is read inline and only misses await the database
+        """
+        cached = self.lookup(token)
+        if cached is not None:
+            return cached
+
+        pending = self.pending.get(token)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only retried when the lookup we waited on was cancelled, not this task
+                if not pending.cancelled():
+                    raise
+                return await self.validate_async(token)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.pending[token] = future
+        try:
+            try:
+                document = await AsyncSession.get_raw(projection=["expires"], **self.query(token))
+            except LookupError:
+                document = None
+            valid = self.remember(token, None if document is None else document["expires"])
+            future.set_result(valid)
+            return valid
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Retrieved here so a lookup nobody else waited on doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self.pending[token]
+
+    def open(self, **fields) -> Session:
+        """
+        Creates and stores a new session
+
+        :param kwargs fields: Extra fields stored with the session
+        """
+        session = Session.new(self.lifetime, **fields).insert()
+        self.remember(session.id, session.expires)
+        return session
+
+    def revoke(self, token: str) -> bool:
+        """
+        Deletes a session, other workers stop accepting it within `staleness` seconds
+
+        :returns bool: Whether a session was deleted
+        """
+        result = Session.__collection__.delete_one({"id": token})
+        self.remember(token, None)
+        return bool(result.deleted_count)
@@ -0,0 +1,177 @@
+# === Core ===
+import os
+import time
+import socket
+import logging
+import threading
+import importlib.util
+import uvicorn
+from uvicorn.supervisors.multiprocess import Multiprocess, Process
+from uvicorn._subprocess import spawn
+
+# === Utils ===
+from utils.helper.config import Yaml
+
+# === Typing ===
+from typing import Any, Dict, List, Optional
+
+# The supervisor logs through uvicorn, the console and the rest of the app stack are only imported by workers
+logger = logging.getLogger("uvicorn.error")
+
+def server_config() -> Dict[str, Any]:
+    """
+    `backend.uvicorn_config` with its placeholders populated, read without building the app
+    """
+    yml = Yaml()
+    return yml.populate_environment(yml.get("backend.uvicorn_config", default={}) or {})
+
+
+def bind_socket(config: uvicorn.Config, reuse_port: bool = False) -> socket.socket:
+    """
+    Binds the TCP listening socket of a server, the way uvicorn does, optionally with `SO_REUSEPORT`
+
+    :param uvicorn.Config config: Server config, `host` and `port` are used
+    :param bool reuse_port: Lets several sockets bind the same address, the kernel spreads connections over them
+    """
+    if not reuse_port:
+        return config.bind_socket()
+
+    family = socket.AF_INET6 if config.host and ":" in config.host else socket.AF_INET
+    sock = socket.socket(family=family)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((config.host, config.port))
+    sock.set_inheritable(True)
+    return sock
+
+
+class Worker:
+    """
+    Target of a worker process, picklable so it survives the spawn into the child.
+
+    Runs the server on the sockets the supervisor passes, or on its own `SO_REUSEPORT` socket,
+    and sets `ready` once the app finished its startup.
+    """
+
+    def __init__(self, server: uvicorn.Server, reuse_port: bool = False, ready: Optional[Any] = None) -> None:
+        """
+        :param uvicorn.Server server: Server to run
+        :param bool reuse_port: Binds a socket of its own instead of using the shared one
+        :param ready: `multiprocessing.Event` set once the server accepts connections
+        """
+        self.server = server
+        self.reuse_port = reuse_port
+        self.ready = ready
+
+    def __call__(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        if self.reuse_port:
+            sockets = [bind_socket(self.server.config, reuse_port=True)]
+
+        if self.ready is not None:
+            threading.Thread(target=self.__signal_ready, name="worker-ready", daemon=True).start()
+
+        self.server.run(sockets=sockets)
+
+    def __signal_ready(self) -> None:
+        while not self.server.started and not self.server.should_exit:
+            time.sleep(0.05)
+        if self.server.started:
+            self.ready.set()
+
+
+class RollingMultiprocess(Multiprocess):
+    """
+    Worker supervisor whose restarts (SIGHUP) replace one worker at a time, start first.
+
+    uvicorn stops a worker before starting its replacement, leaving the pool a worker short for
+    a whole boot. Here the replacement boots alongside, the old worker is only asked to drain
+    (SIGTERM, up to `timeout_graceful_shutdown`) once the new one accepts connections. A
+    replacement that dies or doesn't start within `restart_timeout` aborts the restart and the
+    remaining old workers keep serving, a broken deploy doesn't take the pool down.
+
+    SIGTTIN and SIGTTOU add and remove a worker, as with uvicorn's supervisor.
+    """
+
+    def __init__(self, config: uvicorn.Config, server: uvicorn.Server, sockets: List[socket.socket], reuse_port: bool = False, restart_timeout: float = 60.0) -> None:
+        """
+        :param uvicorn.Config config: Server config, `workers` is the pool size
+        :param uvicorn.Server server: Server every worker runs
+        :param List[socket.socket] sockets: Shared listening sockets, empty with `reuse_port`
+        :param bool reuse_port: Every worker binds its own `SO_REUSEPORT` socket
+        :param float restart_timeout: Seconds a replacement worker gets to start
+        """
+        super().__init__(config, target=Worker(server, reuse_port), sockets=sockets)
+        self.server = server
+        self.reuse_port = reuse_port
+        self.restart_timeout = restart_timeout
+
+    def restart_all(self) -> None:
+        for idx, process in enumerate(list(self.processes)):
+            ready = spawn.Event()
+            replacement = Process(self.config, Worker(self.server, self.reuse_port, ready), self.sockets)
+            replacement.start()
+
+            deadline = time.monotonic() + self.restart_timeout
+            while not ready.wait(0.5):
+                if not replacement.process.is_alive() or time.monotonic() > deadline:
+                    logger.error(f"Replacement of child process [{process.pid}] didn't start, restart aborted")
+                    replacement.terminate()
+                    replacement.kill()
+                    replacement.join()
+                    return
+
+            process.terminate()
+            process.join()
+            self.processes[idx] = replacement
+            logger.info(f"Replaced child process [{process.pid}] with [{replacement.pid}]")
+
+
+def serve(app: str, options: Dict[str, Any]) -> None:
+    """
+    Runs the app with `options` (`backend.uvicorn_config`), in a pool of worker processes when `workers` > 1
+
+    The app is an import string of a factory (`"main:create_app"`), every worker builds its own
+    app after the spawn. The factory module must import the app inside the factory: it's also
+    imported by the supervisor, and a second time by every worker as `__mp_main__`. uvloop and
+    httptools are used unless `loop`/`http` say otherwise.
+
+    :param str app: Import string of the app factory
+    :param Dict[str, Any] options: uvicorn options, plus `reuse_port` and `restart_timeout`
+    """
+    options = dict(options)
+    reuse_port = bool(options.pop("reuse_port", False))
+    restart_timeout = float(options.pop("restart_timeout", 60.0))
+
+    workers = options.pop("workers", 1)
+    if workers == "auto":
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+    for option, module in (("loop", "uvloop"), ("http", "httptools")):
+        if option in options:
+            continue
+        if importlib.util.find_spec(module) is None:
+            logger.warning(f"Server: {module} isn't installed, falling back to uvicorn's default {option}")
+            continue
+        options[option] = module
+
+    config = uvicorn.Config(app, factory=True, workers=int(workers), **options)
+    server = uvicorn.Server(config)
+
+    if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("Server: SO_REUSEPORT isn't supported here, workers share one socket")
+        reuse_port = False
+
+    # Bound up front, a taken port fails here instead of in every worker
+    sock = bind_socket(config, reuse_port)
+    logger.info(f"Server: listening on {config.host}:{config.port}, {config.workers} worker(s), loop {config.loop}, http {config.http}{', SO_REUSEPORT' if reuse_port else ''}")
+
+    try:
+        if config.workers > 1:
+            if reuse_port:
+                # Every worker listens on its own socket, kernel balanced, this one is only a probe
+                sock.close()
+            RollingMultiprocess(config, server, [] if reuse_port else [sock], reuse_port, restart_timeout).run()
+        else:
+            server.run(sockets=[sock])
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1 @@
+from .Server import serve, server_config
@@ -6,6 +6,7 @@ from .ensure_caddy import ensure_caddy
 from .ensure_certs import ensure_certs
 from .ensure_config import ensure_config
 from .ensure_database import ensure_database
+from .ensure_indexes import ensure_indexes
 from .ensure_ssh import ensure_ssh
 
 @click.group(invoke_without_command=True)
@@ -27,4 +28,5 @@ ensure.add_command(ensure_caddy, name="caddy")
 ensure.add_command(ensure_config, name="config")
 ensure.add_command(ensure_certs, name="certs")
 ensure.add_command(ensure_database, name="database")
+ensure.add_command(ensure_indexes, name="indexes")
 ensure.add_command(ensure_ssh, name="ssh")
\ No newline at end of file
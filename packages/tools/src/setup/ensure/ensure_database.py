@@ -12,7 +12,8 @@ def ensure_database(ctx: ctx.Context):
     template_init_file = ctx.obj.project_root / "packages/database/template.init.js"
     template_contents = template_init_file.read_text()
     
-    username, password, auth_db = ctx.obj.config.get("database").values()
+    database = ctx.obj.config.get("database")
+    username, password, auth_db = database["username"], database["password"], database["auth_db"]
     tTable = [["username", username], ["password", password], ["auth_db", auth_db]]
     
     for key, value in tTable:
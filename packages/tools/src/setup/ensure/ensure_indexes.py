@@ -0,0 +1,22 @@
+import ctx
+import click
+from pymongo.errors import PyMongoError
+from utils.console import console
+from utils.mongo.Client import MongoClient
+from utils.abc import WrapperModel
+
+
+@click.command
+@ctx.pass_context
+def ensure_indexes(ctx: ctx.Context):
+    """Ensures the indexes declared on backend models exist"""
+    MongoClient.configure(ctx.obj.config.get("database"))
+
+    try:
+        created = WrapperModel.ensure_all_indexes()
+    except PyMongoError as error:
+        console.error(f"Failed to sync indexes, is the database running? {error}")
+        ctx.abort()
+
+    total = sum(len(names) for names in created.values())
+    console.info(f"Created [blue]{total}[/blue] index(es) over {len(created)} collection(s)")